@@ -1,8 +1,11 @@
 import streamlit as st
-from pawpal_system import CareTask, Pet, Owner, Scheduler
+from pawpal_system import CareTask, Pet, Owner, Scheduler, RANKING_STRATEGIES
 
 st.set_page_config(page_title="PawPal+", page_icon="🐾", layout="centered")
 
+# Number of scheduled tasks rendered in the plan view
+PLAN_PAGE_SIZE = 20
+
 st.title("🐾 PawPal+")
 
 st.markdown(
@@ -167,6 +170,16 @@ if st.session_state.owner is not None:
         placeholder="e.g., category:exercise"
     )
 
+    # Preferences only shape the plan under the preference ranking, so it is the
+    # default whenever the owner has written some
+    default_ranking = "preference" if st.session_state.owner.preferences else "priority"
+    ranking = st.selectbox(
+        "Ranking strategy",
+        RANKING_STRATEGIES,
+        index=RANKING_STRATEGIES.index(default_ranking),
+        help="'preference' boosts categories your preferences mention and skips ones they rule out",
+    )
+
     if st.button("🎯 Generate Optimized Schedule"):
         if not st.session_state.owner.pets:
             st.error("Please add at least one pet first!")
@@ -179,14 +192,19 @@ if st.session_state.owner is not None:
             else:
                 # Create scheduler and generate plan
                 scheduler = Scheduler(
-                    constraints=scheduler_constraints if scheduler_constraints else None
+                    constraints=scheduler_constraints if scheduler_constraints else None,
+                    ranking=ranking,
                 )
                 plan = scheduler.generate_plan(st.session_state.owner, all_tasks)
 
                 # Calculate task statistics
                 total_time = sum(task.duration_minutes for task in plan)
                 remaining_time = st.session_state.owner.available_minutes - total_time
-                excluded_tasks = [task for task in all_tasks if task.is_due() and task not in plan]
+                decisions = scheduler.get_decisions()
+                excluded_tasks = [task for task, decision in decisions if decision == "over budget"]
+                preference_skipped = [
+                    task for task, decision in decisions if decision == "excluded by preference"
+                ]
 
                 # Display the schedule
                 st.success("✅ Schedule Generated!")
@@ -201,11 +219,18 @@ if st.session_state.owner is not None:
                         for task in excluded_tasks:
                             st.write(f"• **{task.title}** ({task.duration_minutes} min, Priority: {task.priority})")
 
+                if preference_skipped:
+                    st.info(
+                        "Skipped because of your preferences: "
+                        + ", ".join(task.title for task in preference_skipped)
+                    )
+
                 st.markdown("### 📋 Today's Optimized Schedule")
 
                 if plan:
-                    # Display tasks in a table format
-                    for i, task in enumerate(plan, 1):
+                    # Display the first page of tasks in a table format
+                    plan_page, next_cursor = scheduler.get_plan_page(limit=PLAN_PAGE_SIZE)
+                    for i, task in enumerate(plan_page, 1):
                         # Priority color coding
                         if task.priority >= 8:
                             priority_badge = "🔴 HIGH"
@@ -226,6 +251,8 @@ if st.session_state.owner is not None:
                             with col3:
                                 st.write(f"{priority_badge}")
                             st.divider()
+                    if next_cursor is not None:
+                        st.caption(f"Showing the top {len(plan_page)} of {len(plan)} scheduled tasks.")
                 else:
                     st.info("No tasks fit within your available time budget.")
 
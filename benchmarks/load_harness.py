@@ -0,0 +1,243 @@
+"""Headless load harness simulating concurrent PawPal+ app sessions.
+
+Each simulated session follows the Streamlit app's flow against the
+pawpal_system API: create an owner, add pets, add tasks to each pet, then
+generate and explain a schedule. Run from the repository root:
+
+    python benchmarks/load_harness.py --sessions 500 --concurrency 100 --mode both
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pawpal_memory import track_allocations  # noqa: E402
+from pawpal_system import CareTask, Owner, Pet, Scheduler  # noqa: E402
+
+# Flows timed by the harness, in the order a session runs them
+FLOWS = ("add_pet", "add_task", "generate_schedule")
+
+CATEGORIES = ["feeding", "exercise", "grooming", "hygiene", "play", "medical"]
+SPECIES = ["Dog", "Cat", "Bird", "Rabbit", "Other"]
+
+
+@dataclass
+class SessionProfile:
+    """Shape of the work one simulated session performs."""
+
+    pets: int = 3
+    tasks_per_pet: int = 8
+    schedules: int = 2
+    constraints: Optional[str] = None
+
+
+@dataclass
+class LoadReport:
+    mode: str
+    sessions: int
+    concurrency: int
+    wall_seconds: float
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    retained_bytes_per_session: int = 0
+    peak_bytes_per_session: int = 0
+
+    def percentiles(self, flow: str) -> Dict[str, float]:
+        """Return p50/p95/p99 latency in milliseconds for one flow."""
+        samples = sorted(self.latencies.get(flow, []))
+        return {name: percentile(samples, pct) * 1000 for name, pct in (("p50", 50), ("p95", 95), ("p99", 99))}
+
+    def format(self) -> str:
+        """Render the report as a plain-text table."""
+        lines = [
+            f"Mode: {self.mode} | sessions: {self.sessions} | concurrency: {self.concurrency} "
+            f"| wall time: {self.wall_seconds:.2f}s",
+            f"{'flow':<20}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+        ]
+        for flow in FLOWS:
+            stats = self.percentiles(flow)
+            lines.append(
+                f"{flow:<20}{len(self.latencies.get(flow, [])):>8}"
+                f"{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}"
+            )
+        lines.append(
+            f"Memory per session: {self.retained_bytes_per_session / 1024:.1f} KiB retained, "
+            f"{self.peak_bytes_per_session / 1024:.1f} KiB peak"
+        )
+        return "\n".join(lines)
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def session_steps(
+    session_id: int, profile: SessionProfile
+) -> List[Tuple[Optional[str], Callable[[], None]]]:
+    """
+    Build the ordered steps of one session as (flow, callable) pairs.
+    The flow is None for setup steps that aren't timed.
+    """
+    rng = random.Random(session_id)
+    state: Dict[str, Owner] = {}
+
+    def create_owner() -> None:
+        state["owner"] = Owner(
+            name=f"Owner {session_id}",
+            available_minutes=rng.randint(30, 480),
+            preferences=rng.choice([None, "Prefer outdoor activities in the morning", "No baths"]),
+        )
+
+    def add_pet(p: int) -> Callable[[], None]:
+        def step() -> None:
+            state["owner"].add_pet(Pet(name=f"Pet {p}", species=rng.choice(SPECIES), age=rng.randint(0, 15)))
+        return step
+
+    def add_task(p: int, t: int) -> Callable[[], None]:
+        def step() -> None:
+            state["owner"].pets[p].add_task(
+                CareTask(
+                    title=f"Task {t}",
+                    duration_minutes=rng.randint(5, 90),
+                    priority=rng.randint(1, 10),
+                    category=rng.choice(CATEGORIES),
+                    is_recurring=rng.random() < 0.3,
+                )
+            )
+        return step
+
+    def generate_schedule() -> None:
+        owner = state["owner"]
+        scheduler = Scheduler(constraints=profile.constraints)
+        scheduler.generate_plan(owner, owner.get_all_tasks())
+        scheduler.explain_plan()
+
+    steps: List[Tuple[Optional[str], Callable[[], None]]] = [(None, create_owner)]
+    for p in range(profile.pets):
+        steps.append(("add_pet", add_pet(p)))
+        steps.extend(("add_task", add_task(p, t)) for t in range(profile.tasks_per_pet))
+    steps.extend([("generate_schedule", generate_schedule)] * profile.schedules)
+    return steps
+
+
+def run_session(session_id: int, profile: SessionProfile) -> Dict[str, List[float]]:
+    """Run one session synchronously and return its per-flow latencies in seconds."""
+    latencies: Dict[str, List[float]] = {flow: [] for flow in FLOWS}
+    for flow, step in session_steps(session_id, profile):
+        start = time.perf_counter()
+        step()
+        if flow is not None:
+            latencies[flow].append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_session_async(
+    session_id: int, profile: SessionProfile, semaphore: asyncio.Semaphore
+) -> Dict[str, List[float]]:
+    """
+    Run one session as an async request handler would: each step is a separate
+    request dispatched to a worker thread, so latency includes queueing.
+    """
+    latencies: Dict[str, List[float]] = {flow: [] for flow in FLOWS}
+    async with semaphore:
+        for flow, step in session_steps(session_id, profile):
+            start = time.perf_counter()
+            await asyncio.to_thread(step)
+            if flow is not None:
+                latencies[flow].append(time.perf_counter() - start)
+    return latencies
+
+
+def measure_session_memory(profile: SessionProfile) -> Dict[str, int]:
+    """
+    Measure one session in isolation with tracemalloc: bytes still held by the
+    session once it finishes, and the peak reached while it ran.
+    """
+    with track_allocations() as stats:
+        # The steps' closures hold the session state, like st.session_state would
+        steps = session_steps(0, profile)
+        for _, step in steps:
+            step()
+    return {"retained": stats.allocated_bytes, "peak": stats.peak_bytes}
+
+
+def run_load_test(
+    sessions: int = 100,
+    concurrency: int = 20,
+    mode: str = "threads",
+    profile: Optional[SessionProfile] = None,
+) -> LoadReport:
+    """Drive many simulated sessions concurrently and collect a LoadReport."""
+    if mode not in ("threads", "asyncio"):
+        raise ValueError(f"Unknown load mode '{mode}'")
+    if sessions <= 0 or concurrency <= 0:
+        raise ValueError("Sessions and concurrency must be positive")
+    profile = profile or SessionProfile()
+
+    start = time.perf_counter()
+    if mode == "threads":
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda i: run_session(i, profile), range(sessions)))
+    else:
+        async def main() -> List[Dict[str, List[float]]]:
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(
+                *(run_session_async(i, profile, semaphore) for i in range(sessions))
+            )
+        results = asyncio.run(main())
+    wall_seconds = time.perf_counter() - start
+
+    latencies: Dict[str, List[float]] = {flow: [] for flow in FLOWS}
+    for result in results:
+        for flow, samples in result.items():
+            latencies[flow].extend(samples)
+
+    memory = measure_session_memory(profile)
+    return LoadReport(
+        mode=mode,
+        sessions=sessions,
+        concurrency=concurrency,
+        wall_seconds=wall_seconds,
+        latencies=latencies,
+        retained_bytes_per_session=memory["retained"],
+        peak_bytes_per_session=memory["peak"],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200, help="number of simulated sessions")
+    parser.add_argument("--concurrency", type=int, default=50, help="sessions running at once")
+    parser.add_argument("--mode", choices=["threads", "asyncio", "both"], default="both")
+    parser.add_argument("--pets", type=int, default=3, help="pets added per session")
+    parser.add_argument("--tasks-per-pet", type=int, default=8, help="tasks added per pet")
+    parser.add_argument("--schedules", type=int, default=2, help="schedules generated per session")
+    parser.add_argument("--constraints", default=None, help='scheduler constraints, e.g. "category:exercise"')
+    args = parser.parse_args()
+
+    profile = SessionProfile(
+        pets=args.pets,
+        tasks_per_pet=args.tasks_per_pet,
+        schedules=args.schedules,
+        constraints=args.constraints,
+    )
+    modes = ["threads", "asyncio"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        print(run_load_test(args.sessions, args.concurrency, mode, profile).format())
+        print()
+
+
+if __name__ == "__main__":
+    main()
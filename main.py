@@ -61,8 +61,8 @@ def main():
     # Get all tasks
     all_tasks = owner.get_all_tasks()
 
-    # Create scheduler and generate plan
-    scheduler = Scheduler()
+    # Create scheduler and generate plan, letting the owner's preferences shape it
+    scheduler = Scheduler(ranking="preference")
     plan = scheduler.generate_plan(owner, all_tasks)
 
     # Print Today's Schedule
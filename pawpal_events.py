@@ -0,0 +1,295 @@
+"""Append-only change-event log and replay for PawPal+ owners."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pawpal_system import CareTask, Owner, Pet
+
+
+class EventLog:
+    """
+    Append-only log of mutations made to a single Owner.
+
+    Events are buffered in memory and written as a group: one write and one
+    fsync per batch rather than per mutation. A batch is written once it holds
+    batch_size events or once its oldest event has waited max_delay seconds,
+    whichever comes first, so a quiet owner's changes still reach disk.
+    compact() folds the current state into a snapshot file next to the log so
+    replay only has to read the events recorded since then.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        owner: Optional[Owner] = None,
+        batch_size: int = 64,
+        sync: bool = True,
+        compact_every: Optional[int] = None,
+        max_delay: Optional[float] = 1.0,
+    ) -> None:
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+        if compact_every is not None and compact_every <= 0:
+            raise ValueError("Compaction interval must be positive")
+        if max_delay is not None and max_delay <= 0:
+            raise ValueError("Flush delay must be positive")
+
+        self.path = path
+        self.snapshot_path = snapshot_path_for(path)
+        self.batch_size = batch_size
+        self.sync = sync
+        self.compact_every = compact_every
+        self.max_delay = max_delay
+        self._buffer: List[str] = []
+        # Guards the buffer and file against the deadline timer's thread
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._events_since_snapshot = 0
+
+        if owner is None:
+            # Resume from disk; compacting straight away also drops any
+            # half-written tail left behind by a crash.
+            self.owner, self._seq = _load(path)
+        else:
+            if os.path.exists(self.snapshot_path):
+                raise ValueError(f"Event log '{path}' already exists")
+            self.owner, self._seq = owner, 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._pet_index = {id(pet): i for i, pet in enumerate(self.owner.pets)}
+        self.compact()
+
+    # ----- Recorded mutations -----
+
+    def add_pet(self, pet: Pet) -> None:
+        """Add a pet to the owner and record the change."""
+        self.owner.add_pet(pet)
+        self._pet_index[id(pet)] = len(self.owner.pets) - 1
+        self._record("add_pet", pet=pet.to_dict())
+
+    def add_task(self, pet: Pet, task: CareTask) -> None:
+        """Add a task to one of the owner's pets and record the change."""
+        position = self._pet_position(pet)
+        pet.add_task(task)
+        self._record("add_task", pet=position, task=task.to_dict())
+
+    def edit_task(self, pet: Pet, task: CareTask) -> None:
+        """Replace a pet's task by title and record the change."""
+        position = self._pet_position(pet)
+        pet.edit_task(task)
+        self._record("edit_task", pet=position, task=task.to_dict())
+
+    def update_priority(self, pet: Pet, task: CareTask, priority: int) -> None:
+        """Update a task's priority and record the change."""
+        pet_position, task_position = self._task_position(pet, task)
+        task.update_priority(priority)
+        self._record("update_priority", pet=pet_position, task=task_position, priority=priority)
+
+    def update_duration(self, pet: Pet, task: CareTask, duration_minutes: int) -> None:
+        """Update a task's duration and record the change."""
+        pet_position, task_position = self._task_position(pet, task)
+        task.update_duration(duration_minutes)
+        self._record(
+            "update_duration", pet=pet_position, task=task_position, duration_minutes=duration_minutes
+        )
+
+    def mark_complete(self, pet: Pet, task: CareTask) -> None:
+        """Mark a task complete and record the change."""
+        pet_position, task_position = self._task_position(pet, task)
+        task.mark_complete()
+        self._record("mark_complete", pet=pet_position, task=task_position)
+
+    def update_preferences(self, preferences: Optional[str]) -> None:
+        """Update the owner's preferences and record the change."""
+        self.owner.update_preferences(preferences)
+        self._record("update_preferences", preferences=preferences)
+
+    # ----- Durability -----
+
+    def flush(self) -> None:
+        """Write buffered events to disk with a single fsync."""
+        self._write_buffer()
+        if self.compact_every is not None and self._events_since_snapshot >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """Write a snapshot of the current owner and truncate the log."""
+        self._write_buffer()
+        snapshot = {"seq": self._seq, "owner": self.owner.to_dict()}
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Events up to self._seq are now in the snapshot; replay skips them
+        # even if we crash before the truncate below lands.
+        self._file.seek(0)
+        self._file.truncate()
+        self._events_since_snapshot = 0
+
+    def close(self) -> None:
+        """Flush pending events and close the log file."""
+        if self._file.closed:
+            return
+        self.flush()
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> EventLog:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ----- Helpers -----
+
+    def _record(self, op: str, **payload: Any) -> None:
+        self._seq += 1
+        self._events_since_snapshot += 1
+        payload["seq"] = self._seq
+        payload["op"] = op
+        with self._lock:
+            self._buffer.append(json.dumps(payload, separators=(",", ":")))
+            full = len(self._buffer) >= self.batch_size
+            if not full and self._timer is None and self.max_delay is not None:
+                self._timer = threading.Timer(self.max_delay, self._write_buffer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def _write_buffer(self) -> None:
+        # Like flush(), but never compacts, so the deadline timer can call it
+        # without snapshotting an owner that is mid-mutation on another thread
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer or self._file.closed:
+                return
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            self._buffer.clear()
+
+    def _pet_position(self, pet: Pet) -> int:
+        position = self._pet_index.get(id(pet))
+        if position is None:
+            raise ValueError(f"Pet '{pet.name}' does not belong to owner '{self.owner.name}'")
+        return position
+
+    def _task_position(self, pet: Pet, task: CareTask) -> Tuple[int, int]:
+        pet_position = self._pet_position(pet)
+        for i, existing_task in enumerate(pet.tasks):
+            if existing_task is task:
+                return pet_position, i
+        raise ValueError(f"Task '{task.title}' not found for pet '{pet.name}'")
+
+
+def snapshot_path_for(path: str) -> str:
+    """Return the snapshot file used alongside the event log at path."""
+    return path + ".snapshot"
+
+
+def replay_owner(path: str) -> Owner:
+    """Rebuild an Owner from the snapshot and event log at path."""
+    owner, _ = _load(path)
+    return owner
+
+
+def apply_event(owner: Owner, event: Dict[str, Any]) -> None:
+    """
+    Apply one event, in the format EventLog records, to an owner.
+    Pets and tasks are addressed by their position in owner.pets and pet.tasks;
+    positions that aren't an in-range, non-negative int raise ValueError.
+    """
+    apply = _APPLY.get(event.get("op"))
+    if apply is None:
+        raise ValueError(f"Unknown event '{event.get('op')}'")
+    apply(owner, event)
+
+
+def _load(path: str) -> Tuple[Owner, int]:
+    with open(snapshot_path_for(path), encoding="utf-8") as f:
+        snapshot = json.load(f)
+    owner = Owner.from_dict(snapshot["owner"])
+    seq = snapshot["seq"]
+
+    if not os.path.exists(path):
+        return owner, seq
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # Torn write from a crash mid-batch; nothing after it was synced
+                break
+            event = json.loads(line)
+            if event["seq"] <= seq:
+                continue
+            apply_event(owner, event)
+            seq = event["seq"]
+    return owner, seq
+
+
+def _position(event: Dict[str, Any], key: str, size: int) -> int:
+    # Events can come from clients, so Python's negative indexing must not
+    # silently address an item from the end
+    position = event[key]
+    if type(position) is not int or not 0 <= position < size:
+        raise ValueError(f"Invalid {key} position {position!r}")
+    return position
+
+
+def _event_pet(owner: Owner, event: Dict[str, Any]) -> Pet:
+    return owner.pets[_position(event, "pet", len(owner.pets))]
+
+
+def _event_task(owner: Owner, event: Dict[str, Any]) -> CareTask:
+    pet = _event_pet(owner, event)
+    return pet.tasks[_position(event, "task", len(pet.tasks))]
+
+
+def _apply_add_pet(owner: Owner, event: Dict[str, Any]) -> None:
+    owner.add_pet(Pet.from_dict(event["pet"]))
+
+
+def _apply_add_task(owner: Owner, event: Dict[str, Any]) -> None:
+    _event_pet(owner, event).add_task(CareTask.from_dict(event["task"]))
+
+
+def _apply_edit_task(owner: Owner, event: Dict[str, Any]) -> None:
+    _event_pet(owner, event).edit_task(CareTask.from_dict(event["task"]))
+
+
+def _apply_update_priority(owner: Owner, event: Dict[str, Any]) -> None:
+    _event_task(owner, event).update_priority(event["priority"])
+
+
+def _apply_update_duration(owner: Owner, event: Dict[str, Any]) -> None:
+    _event_task(owner, event).update_duration(event["duration_minutes"])
+
+
+def _apply_mark_complete(owner: Owner, event: Dict[str, Any]) -> None:
+    _event_task(owner, event).mark_complete()
+
+
+def _apply_update_preferences(owner: Owner, event: Dict[str, Any]) -> None:
+    owner.update_preferences(event["preferences"])
+
+
+_APPLY: Dict[str, Callable[[Owner, Dict[str, Any]], None]] = {
+    "add_pet": _apply_add_pet,
+    "add_task": _apply_add_task,
+    "edit_task": _apply_edit_task,
+    "update_priority": _apply_update_priority,
+    "update_duration": _apply_update_duration,
+    "mark_complete": _apply_mark_complete,
+    "update_preferences": _apply_update_preferences,
+}
@@ -0,0 +1,198 @@
+"""Memory accounting for the PawPal+ domain model."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set
+
+from pawpal_system import CareTask, Owner, Pet, Scheduler
+
+# Which bucket each domain object, and everything it holds, is charged to
+_BUCKETS = {Owner: "owner", Pet: "pets", CareTask: "tasks"}
+
+# tracemalloc is process-wide, so track_allocations() blocks share one tracing
+# session: the first to enter starts it and the last to leave stops it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+@dataclass
+class MemoryReport:
+    owner_bytes: int = 0
+    pets_bytes: int = 0
+    tasks_bytes: int = 0
+    strings_bytes: int = 0
+    pet_count: int = 0
+    task_count: int = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """Return the deep size of the owner across all buckets."""
+        return self.owner_bytes + self.pets_bytes + self.tasks_bytes + self.strings_bytes
+
+    @property
+    def bytes_per_task(self) -> float:
+        """Return the task bucket divided by the number of tasks (strings excluded)."""
+        return self.tasks_bytes / self.task_count if self.task_count else 0.0
+
+    def format(self) -> str:
+        """Render the report as a short multi-line summary."""
+        return (
+            f"Total: {self.total_bytes} bytes\n"
+            f"Owner: {self.owner_bytes} bytes\n"
+            f"Pets ({self.pet_count}): {self.pets_bytes} bytes\n"
+            f"Tasks ({self.task_count}): {self.tasks_bytes} bytes ({self.bytes_per_task:.0f} per task)\n"
+            f"Strings: {self.strings_bytes} bytes"
+        )
+
+
+def measure_owner(owner: Owner) -> MemoryReport:
+    """
+    Report the deep size of an owner broken down by owner, pets, tasks and strings.
+    Each object is counted once, so strings shared between tasks are not double
+    counted, and cached small ints, bools and None are left out entirely.
+    Dataclass fields are read with getattr, never through __dict__, which would
+    build and keep an attribute dict on every object and inflate what it measures.
+    """
+    sizes = {"owner": 0, "pets": 0, "tasks": 0, "strings": 0}
+    counts = {Pet: 0, CareTask: 0}
+    field_names: Dict[type, List[str]] = {}
+    seen: Set[int] = set()
+    stack = [(owner, "owner")]
+
+    while stack:
+        obj, bucket = stack.pop()
+        if id(obj) in seen or _is_shared_singleton(obj):
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+
+        if isinstance(obj, str):
+            sizes["strings"] += size
+            continue
+
+        bucket = _BUCKETS.get(type(obj), bucket)
+        sizes[bucket] += size
+        if type(obj) in counts:
+            counts[type(obj)] += 1
+
+        if is_dataclass(obj):
+            names = field_names.get(type(obj))
+            if names is None:
+                names = field_names[type(obj)] = [f.name for f in fields(obj)]
+            stack.extend((getattr(obj, name), bucket) for name in names)
+        elif isinstance(obj, dict):
+            stack.extend((key, bucket) for key in obj)
+            stack.extend((value, bucket) for value in obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend((item, bucket) for item in obj)
+
+    return MemoryReport(
+        owner_bytes=sizes["owner"],
+        pets_bytes=sizes["pets"],
+        tasks_bytes=sizes["tasks"],
+        strings_bytes=sizes["strings"],
+        pet_count=counts[Pet],
+        task_count=counts[CareTask],
+    )
+
+
+def _is_shared_singleton(obj: Any) -> bool:
+    if obj is None or isinstance(obj, bool):
+        return True
+    return type(obj) is int and -5 <= obj <= 256
+
+
+@dataclass
+class AllocationStats:
+    peak_bytes: int = 0
+    allocated_bytes: int = 0
+
+
+@contextmanager
+def track_allocations() -> Iterator[AllocationStats]:
+    """
+    Trace allocations made inside the block with tracemalloc.
+    On exit, peak_bytes is the highest traced memory above the starting point and
+    allocated_bytes what is still held. Tracing that was already running is left on.
+
+    The traced peak can only be reset while this block is the only user of a tracing
+    session it started. When blocks overlap across threads, or an outer tracer is
+    running, the peak is left alone and peak_bytes is an upper bound that includes
+    everything else traced since the last reset.
+    """
+    global _tracing_users, _tracing_started
+    stats = AllocationStats()
+    with _tracing_lock:
+        if _tracing_users == 0:
+            _tracing_started = not tracemalloc.is_tracing()
+            if _tracing_started:
+                tracemalloc.start()
+        _tracing_users += 1
+        if _tracing_users == 1 and _tracing_started:
+            tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        yield stats
+    finally:
+        with _tracing_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            _tracing_users -= 1
+            if _tracing_users == 0 and _tracing_started:
+                tracemalloc.stop()
+        stats.peak_bytes = max(peak - baseline, 0)
+        stats.allocated_bytes = current - baseline
+
+
+class PlanMemoryProfiler:
+    """
+    Wraps a Scheduler and records peak allocation during generate_plan.
+
+    Tracing slows allocation down considerably, so only every sample_every-th
+    call is traced; the others run at full speed. Only the latest max_samples
+    samples are kept, but peak_bytes covers every sampled call.
+    """
+
+    def __init__(self, scheduler: Scheduler, sample_every: int = 1, max_samples: int = 1000) -> None:
+        if sample_every <= 0:
+            raise ValueError("Sampling interval must be positive")
+        if max_samples <= 0:
+            raise ValueError("Sample limit must be positive")
+        self.scheduler = scheduler
+        self.sample_every = sample_every
+        self.samples: Deque[AllocationStats] = deque(maxlen=max_samples)
+        self._calls = 0
+        self._sampled = 0
+        self._peak_bytes = 0
+
+    def generate_plan(
+        self, owner: Owner, tasks: Optional[List[CareTask]] = None, **kwargs: Any
+    ) -> List[CareTask]:
+        """Generate a plan, tracing allocations if this call is sampled."""
+        if tasks is None:
+            tasks = owner.get_all_tasks()
+        self._calls += 1
+        if (self._calls - 1) % self.sample_every:
+            return self.scheduler.generate_plan(owner, tasks, **kwargs)
+
+        with track_allocations() as stats:
+            plan = self.scheduler.generate_plan(owner, tasks, **kwargs)
+        self.samples.append(stats)
+        self._sampled += 1
+        self._peak_bytes = max(self._peak_bytes, stats.peak_bytes)
+        return plan
+
+    @property
+    def peak_bytes(self) -> int:
+        """Return the highest peak seen across sampled calls."""
+        return self._peak_bytes
+
+    def summary(self) -> Dict[str, int]:
+        """Return call and sample counts with the maximum observed peak."""
+        return {"calls": self._calls, "samples": self._sampled, "peak_bytes": self.peak_bytes}
@@ -0,0 +1,239 @@
+"""SQLite-backed storage for PawPal+ owners, pets and tasks."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from pawpal_system import CareTask, Owner, Pet, parse_category_constraint
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS owners (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    available_minutes INTEGER NOT NULL,
+    preferences TEXT
+);
+CREATE TABLE IF NOT EXISTS pets (
+    id INTEGER PRIMARY KEY,
+    owner_id INTEGER NOT NULL REFERENCES owners(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    species TEXT NOT NULL,
+    age INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    pet_id INTEGER NOT NULL REFERENCES pets(id),
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    category TEXT NOT NULL COLLATE NOCASE,
+    is_recurring INTEGER NOT NULL,
+    is_completed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pets_owner ON pets (owner_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_pet ON tasks (pet_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (category);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_completion ON tasks (is_completed, is_recurring);
+"""
+
+# Columns returned by the household query, in order
+_HOUSEHOLD_QUERY = """
+SELECT o.name, o.available_minutes, o.preferences,
+       p.id, p.name, p.species, p.age,
+       t.title, t.duration_minutes, t.priority, t.category, t.is_recurring, t.is_completed
+FROM owners o
+LEFT JOIN pets p ON p.owner_id = o.id
+LEFT JOIN tasks t ON t.pet_id = p.id{task_filters}
+WHERE o.id = ?
+ORDER BY p.position, t.position
+"""
+
+
+class OwnerRepository:
+    """
+    Stores owners, pets and tasks in SQLite and loads one household at a time.
+
+    Writes go through executemany in a single transaction. Loading a household
+    is one joined query, with due-status and category filtering done in SQL so
+    only the tasks a plan can use are turned into CareTask objects.
+
+    The connection may be shared between threads; a lock serializes its use.
+    Write transactions take SQLite's write lock before reading the next free ids,
+    so other connections to the same file can't claim the same ids in between.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def save_owner(self, owner: Owner) -> int:
+        """Insert an owner with its pets and tasks and return the new owner id."""
+        return self.save_owners([owner])[0]
+
+    def save_owners(self, owners: Iterable[Owner]) -> List[int]:
+        """Insert many owners in one transaction and return their ids in order."""
+        owners = list(owners)
+        with self._write():
+            owner_id = self._next_id("owners")
+            owner_ids = list(range(owner_id, owner_id + len(owners)))
+            self.connection.executemany(
+                "INSERT INTO owners (id, name, available_minutes, preferences) VALUES (?, ?, ?, ?)",
+                [
+                    (oid, owner.name, owner.available_minutes, owner.preferences)
+                    for oid, owner in zip(owner_ids, owners)
+                ],
+            )
+            self._insert_pets(zip(owner_ids, owners))
+        return owner_ids
+
+    def update_owner(self, owner_id: int, owner: Owner) -> None:
+        """Replace a stored owner, including all of its pets and tasks."""
+        with self._write():
+            cursor = self.connection.execute(
+                "UPDATE owners SET name = ?, available_minutes = ?, preferences = ? WHERE id = ?",
+                (owner.name, owner.available_minutes, owner.preferences, owner_id),
+            )
+            if cursor.rowcount == 0:
+                raise ValueError(f"Owner {owner_id} not found")
+            self._delete_pets(owner_id)
+            self._insert_pets([(owner_id, owner)])
+
+    def delete_owner(self, owner_id: int) -> None:
+        """Delete a stored owner with its pets and tasks."""
+        with self._write():
+            self._delete_pets(owner_id)
+            cursor = self.connection.execute("DELETE FROM owners WHERE id = ?", (owner_id,))
+            if cursor.rowcount == 0:
+                raise ValueError(f"Owner {owner_id} not found")
+
+    def load_owner(
+        self, owner_id: int, constraints: Optional[str] = None, due_only: bool = False
+    ) -> Owner:
+        """
+        Load one owner with its pets and tasks in a single query.
+        constraints uses the Scheduler's "category:<name>" format. Filtering only
+        drops tasks; every pet is returned so the household stays intact.
+        """
+        task_filters = ""
+        params: List[Any] = []
+        if due_only:
+            task_filters += " AND (t.is_completed = 0 OR t.is_recurring = 1)"
+        category = parse_category_constraint(constraints)
+        if category is not None:
+            task_filters += " AND t.category = ?"
+            params.append(category)
+        params.append(owner_id)
+
+        with self._lock:
+            rows = self.connection.execute(
+                _HOUSEHOLD_QUERY.format(task_filters=task_filters), params
+            ).fetchall()
+        if not rows:
+            raise ValueError(f"Owner {owner_id} not found")
+        return _build_owner(rows)
+
+    def load_household(self, owner_id: int, constraints: Optional[str] = None) -> Owner:
+        """Load only the due tasks a Scheduler with these constraints could plan."""
+        return self.load_owner(owner_id, constraints=constraints, due_only=True)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> OwnerRepository:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ----- Helpers -----
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE takes the write lock up front instead of at the first
+        # INSERT, so the MAX(id) read by _next_id stays valid until commit
+        with self._lock, self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            yield
+
+    def _next_id(self, table: str) -> int:
+        (max_id,) = self.connection.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()
+        return max_id + 1
+
+    def _insert_pets(self, owners: Iterable[Tuple[int, Owner]]) -> None:
+        # Ids are assigned up front so tasks can reference their pet without
+        # a lastrowid round trip per pet
+        pet_id = self._next_id("pets")
+        pet_rows = []
+        task_rows = []
+        for owner_id, owner in owners:
+            for pet_position, pet in enumerate(owner.pets):
+                pet_rows.append((pet_id, owner_id, pet_position, pet.name, pet.species, pet.age))
+                task_rows.extend(
+                    (
+                        pet_id,
+                        task_position,
+                        task.title,
+                        task.duration_minutes,
+                        task.priority,
+                        task.category,
+                        task.is_recurring,
+                        task.is_completed,
+                    )
+                    for task_position, task in enumerate(pet.tasks)
+                )
+                pet_id += 1
+
+        self.connection.executemany(
+            "INSERT INTO pets (id, owner_id, position, name, species, age) VALUES (?, ?, ?, ?, ?, ?)",
+            pet_rows,
+        )
+        self.connection.executemany(
+            "INSERT INTO tasks (pet_id, position, title, duration_minutes, priority, category, "
+            "is_recurring, is_completed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            task_rows,
+        )
+
+    def _delete_pets(self, owner_id: int) -> None:
+        self.connection.execute(
+            "DELETE FROM tasks WHERE pet_id IN (SELECT id FROM pets WHERE owner_id = ?)", (owner_id,)
+        )
+        self.connection.execute("DELETE FROM pets WHERE owner_id = ?", (owner_id,))
+
+
+def _build_owner(rows: List[Tuple[Any, ...]]) -> Owner:
+    """Assemble an Owner from household query rows ordered by pet and task position."""
+    name, available_minutes, preferences = rows[0][:3]
+    owner = Owner(name=name, available_minutes=available_minutes, preferences=preferences)
+
+    pet = None
+    pet_id = None
+    for row in rows:
+        if row[3] is None:
+            continue  # Owner without pets
+        if row[3] != pet_id:
+            pet_id = row[3]
+            pet = Pet(name=row[4], species=row[5], age=row[6])
+            owner.pets.append(pet)
+        if row[7] is not None:
+            pet.tasks.append(
+                CareTask(
+                    title=row[7],
+                    duration_minutes=row[8],
+                    priority=row[9],
+                    category=row[10],
+                    is_recurring=bool(row[11]),
+                    is_completed=bool(row[12]),
+                )
+            )
+    return owner
@@ -1,7 +1,60 @@
 from __future__ import annotations
 
+import heapq
+import json
+import re
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Optional
+from itertools import chain
+from operator import attrgetter
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+# Per-task scheduling decisions, indexed by the codes recorded during planning
+DECISIONS = (
+    "selected",
+    "over budget",
+    "filtered by constraint",
+    "not due",
+    "excluded by preference",
+    "over pet quota",
+    "beyond limit",
+)
+_SELECTED, _OVER_BUDGET, _FILTERED, _NOT_DUE, _EXCLUDED, _OVER_QUOTA, _BEYOND_LIMIT = range(len(DECISIONS))
+
+# Ranking strategies accepted by Scheduler(ranking=...)
+RANKING_STRATEGIES = ("priority", "priority_per_minute", "category_weight", "preference")
+
+# How Scheduler(tie_break=...) orders tasks with equal ranking scores
+TIE_BREAKS = ("insertion", "shortest")
+
+# Word prefixes in owner preferences that point at each task category
+CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "feeding": ("feed", "meal", "food", "breakfast", "dinner"),
+    "exercise": ("exercise", "walk", "run", "outdoor", "hike"),
+    "grooming": ("groom", "brush", "bath"),
+    "hygiene": ("hygiene", "litter", "clean"),
+    "play": ("play", "toy", "fetch"),
+    "medical": ("medical", "medicine", "meds", "vet"),
+}
+
+# Priority points added each time the owner's preferences mention a category
+PREFERENCE_BOOST = 2.0
+
+# Words that exclude the categories named after them in the same clause
+# ("no baths", "please don't schedule grooming")
+NEGATION_WORDS = frozenset({"no", "not", "never", "avoid", "skip", "without", "exclude", "don't", "dont"})
+
+# Words that turn a preceding negation back into a positive ("don't mind walks",
+# "never miss the meds", "no rush with breakfast")
+NEGATION_CANCELLERS = frozenset({"mind", "miss", "forget", "rush", "hurry", "worry"})
+
+# generate_plan pops a heap only while the budget is expected to select less than
+# this share of the due tasks; from there on a single sort is cheaper
+HEAP_SELECTION_SHARE = 0.05
+
+# Times of day recognised in owner preferences
+TIMES_OF_DAY = ("morning", "afternoon", "evening", "night")
 
 
 @dataclass
@@ -33,6 +86,27 @@ class CareTask:
         """Mark the task as completed."""
         self.is_completed = True
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the task to a plain dictionary."""
+        return {
+            "title": self.title,
+            "duration_minutes": self.duration_minutes,
+            "priority": self.priority,
+            "category": self.category,
+            "is_recurring": self.is_recurring,
+            "is_completed": self.is_completed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> CareTask:
+        """Build a task from a dictionary produced by to_dict(), validating it like the setters do."""
+        task = cls(**data)
+        if task.duration_minutes <= 0:
+            raise ValueError("Duration must be positive")
+        if task.priority < 0:
+            raise ValueError("Priority must be non-negative")
+        return task
+
 
 @dataclass
 class Pet:
@@ -57,6 +131,72 @@ class Pet:
         """Return all tasks for this pet."""
         return self.tasks
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the pet and its tasks to a plain dictionary."""
+        return {
+            "name": self.name,
+            "species": self.species,
+            "age": self.age,
+            "tasks": [task.to_dict() for task in self.tasks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Pet:
+        """Build a pet from a dictionary produced by to_dict()."""
+        return cls(
+            name=data["name"],
+            species=data["species"],
+            age=data["age"],
+            tasks=[CareTask.from_dict(task) for task in data.get("tasks", [])],
+        )
+
+
+@dataclass
+class CarePreferences:
+    category_boosts: Dict[str, float] = field(default_factory=dict)
+    excluded_categories: FrozenSet[str] = frozenset()
+    time_of_day: Optional[str] = None
+
+    @classmethod
+    def parse(cls, text: Optional[str]) -> CarePreferences:
+        """
+        Parse free-text owner preferences into category boosts, exclusions and a time of day.
+        A negation word excludes every category mentioned after it up to the end of its
+        clause ("don't schedule grooming", "no walks or baths"). A second negation or a
+        cancelling word turns it back off ("never skip the vet", "I don't mind walks");
+        mentions outside a negation boost the category.
+        """
+        if not text:
+            return cls()
+
+        boosts: Dict[str, float] = {}
+        excluded = set()
+        time_of_day = None
+
+        for clause in re.split(r"[.,;!?]|\bbut\b", text.lower()):
+            negated = False
+            for word in re.findall(r"[a-z']+", clause):
+                if word in NEGATION_WORDS:
+                    negated = not negated
+                    continue
+                if word in NEGATION_CANCELLERS:
+                    negated = False
+                    continue
+                if time_of_day is None and word in TIMES_OF_DAY:
+                    time_of_day = word
+                for category, keywords in CATEGORY_KEYWORDS.items():
+                    if word.startswith(keywords):
+                        if negated:
+                            excluded.add(category)
+                        else:
+                            boosts[category] = boosts.get(category, 0.0) + PREFERENCE_BOOST
+
+        # An explicit exclusion wins over a boost from another clause
+        for category in excluded:
+            boosts.pop(category, None)
+
+        return cls(category_boosts=boosts, excluded_categories=frozenset(excluded), time_of_day=time_of_day)
+
 
 @dataclass
 class Owner:
@@ -64,6 +204,9 @@ class Owner:
     available_minutes: int
     preferences: Optional[str] = None
     pets: List[Pet] = field(default_factory=list)
+    _parsed_preferences: Optional[Tuple[Optional[str], CarePreferences]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def add_pet(self, pet: Pet) -> None:
         """Add a pet to the owner's collection."""
@@ -72,6 +215,18 @@ class Owner:
     def update_preferences(self, preferences: Optional[str]) -> None:
         """Update the owner's care preferences."""
         self.preferences = preferences
+        self._parsed_preferences = None
+
+    def get_preferences(self) -> CarePreferences:
+        """
+        Return the structured preferences parsed from the preferences text.
+        The result is cached until the text changes, so scheduling never re-parses it.
+        """
+        cached = self._parsed_preferences
+        if cached is None or cached[0] is not self.preferences:
+            cached = (self.preferences, CarePreferences.parse(self.preferences))
+            self._parsed_preferences = cached
+        return cached[1]
 
     def get_all_tasks(self) -> List[CareTask]:
         """Retrieve all tasks from all pets owned by this owner."""
@@ -80,72 +235,558 @@ class Owner:
             all_tasks.extend(pet.get_tasks())
         return all_tasks
 
+    def iter_tasks(self) -> Iterator[CareTask]:
+        """Iterate over all tasks from all pets without building a combined list."""
+        return chain.from_iterable(pet.tasks for pet in self.pets)
+
+    def top_tasks(self, k: int, due_only: bool = True) -> List[CareTask]:
+        """
+        Return the k highest-priority tasks across all pets, highest first.
+        Uses partial selection, so cost grows with n log k rather than n log n.
+        """
+        tasks = self.iter_tasks()
+        if due_only:
+            tasks = (task for task in tasks if task.is_due())
+        return heapq.nlargest(k, tasks, key=_priority)
+
+    def get_tasks_page(
+        self, cursor: Optional[str] = None, limit: int = 20
+    ) -> Tuple[List[CareTask], Optional[str]]:
+        """
+        Return one page of tasks in pet order and the cursor for the next page.
+        The cursor is None once the last page has been returned.
+        """
+        if limit <= 0:
+            raise ValueError("Page size must be positive")
+
+        pet_index, task_index = _parse_cursor(cursor, parts=2)
+        page: List[CareTask] = []
+        while pet_index < len(self.pets) and len(page) < limit:
+            tasks = self.pets[pet_index].tasks
+            chunk = tasks[task_index:task_index + limit - len(page)]
+            page.extend(chunk)
+            task_index += len(chunk)
+            if task_index >= len(tasks):
+                pet_index, task_index = pet_index + 1, 0
+
+        # Skip pets with nothing left so the last page reports no cursor
+        while pet_index < len(self.pets) and task_index >= len(self.pets[pet_index].tasks):
+            pet_index, task_index = pet_index + 1, 0
+
+        if pet_index >= len(self.pets):
+            return page, None
+        return page, f"{pet_index}:{task_index}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the owner, pets and tasks to a plain dictionary."""
+        return {
+            "name": self.name,
+            "available_minutes": self.available_minutes,
+            "preferences": self.preferences,
+            "pets": [pet.to_dict() for pet in self.pets],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Owner:
+        """Build an owner from a dictionary produced by to_dict()."""
+        return cls(
+            name=data["name"],
+            available_minutes=data["available_minutes"],
+            preferences=data.get("preferences"),
+            pets=[Pet.from_dict(pet) for pet in data.get("pets", [])],
+        )
+
+
+@dataclass
+class PlanDiff:
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    reprioritized: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        """Return True if the plan changed at all."""
+        return bool(self.added or self.removed or self.reprioritized)
+
+    def to_delta(self) -> str:
+        """
+        Serialize the diff as compact JSON, omitting empty sections:
+        "+" lists [key, priority, duration_minutes], "-" lists removed keys,
+        "~" lists [key, old priority, new priority].
+        """
+        delta: Dict[str, List[Any]] = {}
+        if self.added:
+            delta["+"] = [[entry["key"], entry["priority"], entry["duration_minutes"]] for entry in self.added]
+        if self.removed:
+            delta["-"] = self.removed
+        if self.reprioritized:
+            delta["~"] = [[entry["key"], entry["old_priority"], entry["priority"]] for entry in self.reprioritized]
+        return json.dumps(delta, separators=(",", ":"))
+
+    @classmethod
+    def from_delta(cls, delta: str) -> PlanDiff:
+        """Rebuild a diff from the output of to_delta()."""
+        data = json.loads(delta)
+        return cls(
+            added=[
+                {"key": key, "priority": priority, "duration_minutes": duration}
+                for key, priority, duration in data.get("+", [])
+            ],
+            removed=data.get("-", []),
+            reprioritized=[
+                {"key": key, "old_priority": old, "priority": new} for key, old, new in data.get("~", [])
+            ],
+        )
+
+
+@dataclass
+class _PlanSummary:
+    mode: str
+    owner_name: str
+    available_minutes: int
+    preferences: Optional[str]
+    time_of_day: Optional[str]
+    selected: int
+    total_minutes: int
+    pet_minutes: Optional[List[Tuple[str, int]]] = None
+
 
 class Scheduler:
-    def __init__(self, constraints: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        constraints: Optional[str] = None,
+        ranking: str = "priority",
+        tie_break: str = "insertion",
+        category_weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        if ranking not in RANKING_STRATEGIES:
+            raise ValueError(f"Unknown ranking strategy '{ranking}'")
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie-break '{tie_break}'")
         self.constraints = constraints
+        self.ranking = ranking
+        self.tie_break = tie_break
+        self.category_weights = category_weights or {}
         self.plan: List[CareTask] = []
-        self.reasoning: Optional[str] = None
 
-    def generate_plan(self, owner: Owner, tasks: List[CareTask]) -> List[CareTask]:
+        # Raw material for explain_plan(); text is only rendered on request
+        self._summary: Optional[_PlanSummary] = None
+        self._decisions = array("b")
+        self._decision_tasks: Tuple[CareTask, ...] = ()
+        self._explanation: Optional[Tuple[int, str]] = None
+
+    @property
+    def reasoning(self) -> Optional[str]:
+        """Explanation of the most recent plan, rendered on first access."""
+        return self.explain_plan()
+
+    def generate_plan(
+        self, owner: Owner, tasks: List[CareTask], limit: Optional[int] = None
+    ) -> List[CareTask]:
         """
         Generate an optimized care plan based on owner's available time and task priorities.
         Returns a list of tasks sorted by priority that fit within the time budget.
+        If limit is given, stops once that many tasks have been selected.
         """
-        # Filter tasks based on constraints first
-        filtered_tasks = self.filter_tasks_by_constraints(tasks)
+        # One decision per input task; anything never popped ran out of budget
+        decisions = array("b", [_OVER_BUDGET]) * len(tasks)
 
-        # Only include tasks that are due
-        due_tasks = [task for task in filtered_tasks if task.is_due()]
+        # Keep due tasks that pass the constraints and preferences
+        due_tasks, positions = self._schedulable_tasks(owner, tasks, decisions)
+        n = len(due_tasks)
+        available = owner.available_minutes
+        due_minutes = sum(task.duration_minutes for task in due_tasks)
+        shortest = min((task.duration_minutes for task in due_tasks), default=0)
 
-        # Sort by priority (higher priority first)
-        sorted_tasks = sorted(due_tasks, key=lambda t: t.priority, reverse=True)
+        # Each heap pop is a separate call, so the heap only wins when the budget or
+        # limit stops selection early; otherwise one sort of every due task is cheaper
+        expected = n if due_minutes <= available else n * available // due_minutes
+        if limit is not None:
+            expected = min(expected, limit)
+        if expected >= n * HEAP_SELECTION_SHARE:
+            order = iter(self._ranked_positions(owner, due_tasks))
+            remaining = order
+        else:
+            heap = self._ranking_entries(self._ranking_keys(owner, due_tasks))
+            heapq.heapify(heap)
+            order = (heapq.heappop(heap) % n for _ in range(n))
+            # Reads whatever is still on the heap once the limit is hit
+            remaining = (entry % n for entry in heap)
 
-        # Select tasks that fit within available time
+        # Select tasks in ranked order that fit within available time, stopping
+        # as soon as not even the shortest due task could still fit
         selected_tasks = []
         total_time = 0
 
-        for task in sorted_tasks:
-            if total_time + task.duration_minutes <= owner.available_minutes:
+        for i in order:
+            if available - total_time < shortest:
+                break
+            if limit is not None and len(selected_tasks) >= limit:
+                for j in chain((i,), remaining):
+                    decisions[positions[j]] = _BEYOND_LIMIT
+                break
+            task = due_tasks[i]
+            if total_time + task.duration_minutes <= available:
                 selected_tasks.append(task)
                 total_time += task.duration_minutes
+                decisions[positions[i]] = _SELECTED
 
-        # Store the plan and reasoning
+        # Store the plan and the raw material for its explanation
         self.plan = selected_tasks
-        self.reasoning = (
-            f"Generated plan for {owner.name} with {owner.available_minutes} minutes available.\n"
-            f"Selected {len(selected_tasks)} tasks totaling {total_time} minutes.\n"
-            f"Tasks prioritized by urgency and importance."
-        )
+        self._record(owner, "plan", total_time, decisions, tasks)
+        return self.plan
+
+    def generate_fair_plan(
+        self,
+        owner: Owner,
+        min_minutes: Optional[Dict[str, int]] = None,
+        max_minutes: Optional[Dict[str, int]] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> List[CareTask]:
+        """
+        Generate a care plan that shares the owner's time fairly between pets.
+        Quotas and weights are keyed by pet name. Minimum minutes are reserved first;
+        after that pets compete on their best remaining priority, or, when weights are
+        given, the pet furthest below its weighted share of scheduled minutes goes next.
+        Each pet keeps its own heap and only the heads are merged. Keying and heapifying
+        the n tasks is O(n) for the priority strategy; float strategies also rank their
+        distinct scores, O(n log n) at worst. Each selection then pops one pet's heap and
+        the merged heads, O(log m + log p) for p pets with at most m tasks each.
+        """
+        min_minutes = min_minutes or {}
+        max_minutes = max_minutes or {}
+        for name, minimum in min_minutes.items():
+            if name in max_minutes and minimum > max_minutes[name]:
+                raise ValueError(f"Minimum minutes for pet '{name}' exceed its maximum")
+        if weights and any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Pet weights must be positive")
 
-        if owner.preferences:
-            self.reasoning += f"\nOwner preferences considered: {owner.preferences}"
+        # Key every task once across the household, so keys from different pets
+        # compare exactly as they would in generate_plan, then split the entries
+        # into one heap per pet; decisions cover every task in pet order
+        pets = owner.pets
+        tasks = owner.get_all_tasks()
+        decisions = array("b", [_OVER_BUDGET]) * len(tasks)
+        due_tasks, positions = self._schedulable_tasks(owner, tasks, decisions)
+        n = len(due_tasks)
+        pet_of = [p for p, pet in enumerate(pets) for _ in pet.tasks]
+        heaps: List[List[int]] = [[] for _ in pets]
+        for i, entry in enumerate(self._ranking_entries(self._ranking_keys(owner, due_tasks))):
+            heaps[pet_of[positions[i]]].append(entry)
+        for heap in heaps:
+            heapq.heapify(heap)
 
+        caps = [max_minutes.get(pet.name) for pet in pets]
+        pet_minutes = [0] * len(pets)
+        selected_tasks = []
+        total_time = 0
+
+        def take_next(p: int) -> None:
+            nonlocal total_time
+            i = heapq.heappop(heaps[p]) % n
+            task = due_tasks[i]
+            duration = task.duration_minutes
+            cap = caps[p]
+            # Time only accumulates, so a task that doesn't fit now never will
+            if total_time + duration > owner.available_minutes:
+                return
+            if cap is not None and pet_minutes[p] + duration > cap:
+                decisions[positions[i]] = _OVER_QUOTA
+                return
+            selected_tasks.append(task)
+            total_time += duration
+            pet_minutes[p] += duration
+            decisions[positions[i]] = _SELECTED
+
+        # Reserve each pet's minimum before anyone competes for the rest
+        for p, pet in enumerate(pets):
+            minimum = min_minutes.get(pet.name, 0)
+            while heaps[p] and pet_minutes[p] < minimum:
+                take_next(p)
+
+        # Merge the heads of the per-pet heaps; keys are unique, so pets never tie
+        if weights:
+            shares = [weights.get(pet.name, 1.0) for pet in pets]
+
+            def head_key(p: int) -> Any:
+                return (pet_minutes[p] / shares[p], heaps[p][0])
+        else:
+            def head_key(p: int) -> Any:
+                return heaps[p][0]
+
+        merged = [(head_key(p), p) for p in range(len(pets)) if heaps[p]]
+        heapq.heapify(merged)
+        while merged and total_time < owner.available_minutes:
+            _, p = heapq.heappop(merged)
+            take_next(p)
+            if heaps[p]:
+                heapq.heappush(merged, (head_key(p), p))
+
+        # Store the plan and the raw material for its explanation
+        self.plan = selected_tasks
+        self._record(owner, "fair plan", total_time, decisions, tasks)
+        self._summary.pet_minutes = [(pet.name, minutes) for pet, minutes in zip(pets, pet_minutes)]
         return self.plan
 
-    def explain_plan(self) -> Optional[str]:
-        return self.reasoning
+    def rank_tasks(self, owner: Owner, tasks: List[CareTask]) -> List[CareTask]:
+        """Return the schedulable tasks, best-ranked first."""
+        due_tasks, _ = self._schedulable_tasks(owner, tasks, array("b", bytes(len(tasks))))
+        if self.ranking == "priority" and self.tie_break == "insertion":
+            # Sorting the tasks themselves skips building keys and mapping back
+            return sorted(due_tasks, key=_priority, reverse=True)
+        return list(map(due_tasks.__getitem__, self._ranked_positions(owner, due_tasks)))
+
+    def _schedulable_tasks(
+        self, owner: Owner, tasks: List[CareTask], decisions: array
+    ) -> Tuple[List[CareTask], List[int]]:
+        """
+        Return the due tasks that pass the constraints and, under the preference ranking,
+        aren't excluded by the owner, with their positions in decisions. Rejected tasks
+        get their decision recorded.
+        """
+        category = parse_category_constraint(self.constraints)
+        excluded: FrozenSet[str] = frozenset()
+        if self.ranking == "preference":
+            excluded = owner.get_preferences().excluded_categories
+        due_tasks = []
+        positions = []
+        for i, task in enumerate(tasks):
+            if category is not None and task.category.lower() != category:
+                decisions[i] = _FILTERED
+            elif not task.is_due():
+                decisions[i] = _NOT_DUE
+            elif excluded and task.category.lower() in excluded:
+                decisions[i] = _EXCLUDED
+            else:
+                due_tasks.append(task)
+                positions.append(i)
+        return due_tasks, positions
+
+    def _ranked_positions(self, owner: Owner, tasks: List[CareTask]) -> List[int]:
+        """Return the positions of tasks in ranked order; the stable sort keeps insertion ties."""
+        keys = self._ranking_keys(owner, tasks)
+        return sorted(range(len(tasks)), key=keys.__getitem__)
+
+    def _ranking_entries(self, keys: List[Any]) -> List[int]:
+        """
+        Pack each key with its position into one int entry: key * n + position.
+        Entries compare as plain ints and entry % n recovers the task's position.
+        """
+        if self.ranking != "priority" and self.tie_break != "shortest":
+            keys = _dense_ranks(keys)
+        n = len(keys)
+        return [key * n + i for i, key in enumerate(keys)]
+
+    def _ranking_keys(self, owner: Owner, tasks: List[CareTask]) -> List[Any]:
+        """
+        Precompute one key per task, lowest first, with the shortest tie-break folded in.
+        Keys are ints, except for float strategies with insertion ties where the
+        float score is the key; a single sort or heap never compares tuples.
+        """
+        if self.ranking == "priority_per_minute":
+            scores = [-task.priority / task.duration_minutes for task in tasks]
+        elif self.ranking == "category_weight":
+            weights = self.category_weights
+            scores = [-task.priority * weights.get(task.category, 1.0) for task in tasks]
+        elif self.ranking == "preference":
+            boosts = owner.get_preferences().category_boosts
+            scores = [-task.priority - boosts.get(task.category.lower(), 0.0) for task in tasks]
+        else:
+            scores = [-task.priority for task in tasks]
+
+        if self.tie_break == "shortest":
+            if self.ranking != "priority":
+                scores = _dense_ranks(scores)
+            durations = [task.duration_minutes for task in tasks]
+            low = min(durations, default=0)
+            span = max(durations, default=0) - low + 1
+            scores = [score * span + duration - low for score, duration in zip(scores, durations)]
+        return scores
+
+    def top_tasks(self, owner: Owner, tasks: List[CareTask], k: int) -> List[CareTask]:
+        """
+        Return the k best-ranked schedulable tasks, in the order generate_plan ranks them.
+        Uses partial selection over the packed ranking entries instead of a full sort.
+        """
+        due_tasks, _ = self._schedulable_tasks(owner, tasks, array("b", bytes(len(tasks))))
+        n = len(due_tasks)
+        entries = self._ranking_entries(self._ranking_keys(owner, due_tasks))
+        return [due_tasks[entry % n] for entry in heapq.nsmallest(k, entries)]
+
+    def get_plan_page(
+        self, cursor: Optional[str] = None, limit: int = 20
+    ) -> Tuple[List[CareTask], Optional[str]]:
+        """
+        Return one page of the current plan and the cursor for the next page.
+        The cursor is None once the last page has been returned.
+        """
+        if limit <= 0:
+            raise ValueError("Page size must be positive")
+
+        (start,) = _parse_cursor(cursor, parts=1)
+        end = start + limit
+        page = self.plan[start:end]
+        return page, (str(end) if end < len(self.plan) else None)
+
+    def snapshot_plan(self, owner: Owner) -> List[Dict[str, Any]]:
+        """
+        Return the current plan as JSON-friendly entries keyed by "<pet name>/<task title>".
+        Store it and pass it to diff_plan() later to see what changed.
+        """
+        pet_names = {id(task): pet.name for pet in owner.pets for task in pet.tasks}
+        snapshot = []
+        seen: Dict[str, int] = {}
+        for task in self.plan:
+            key = f"{pet_names.get(id(task), '')}/{task.title}"
+            # Repeated titles for one pet get a stable occurrence suffix
+            count = seen.get(key, 0)
+            seen[key] = count + 1
+            if count:
+                key = f"{key}#{count}"
+            snapshot.append(
+                {
+                    "key": key,
+                    "title": task.title,
+                    "priority": task.priority,
+                    "duration_minutes": task.duration_minutes,
+                }
+            )
+        return snapshot
+
+    def diff_plan(self, owner: Owner, previous: List[Dict[str, Any]]) -> PlanDiff:
+        """
+        Compare the current plan with a snapshot of an earlier one in O(n) by task key.
+        Returns the tasks added, the keys removed and the tasks whose priority changed.
+        """
+        previous_by_key = {entry["key"]: entry for entry in previous}
+        diff = PlanDiff()
+        current_keys = set()
+        for entry in self.snapshot_plan(owner):
+            key = entry["key"]
+            current_keys.add(key)
+            before = previous_by_key.get(key)
+            if before is None:
+                diff.added.append(entry)
+            elif before["priority"] != entry["priority"]:
+                diff.reprioritized.append(
+                    {"key": key, "old_priority": before["priority"], "priority": entry["priority"]}
+                )
+        diff.removed = [entry["key"] for entry in previous if entry["key"] not in current_keys]
+        return diff
+
+    def get_decisions(self) -> List[Tuple[CareTask, str]]:
+        """
+        Return why each task passed to the last plan was or wasn't scheduled.
+        Each entry pairs a task with one of DECISIONS, in input order.
+        """
+        return [(task, DECISIONS[code]) for task, code in zip(self._decision_tasks, self._decisions)]
+
+    def explain_plan(self, detail_limit: int = 20) -> Optional[str]:
+        """
+        Explain the most recent plan: totals, skip counts per reason and the first
+        detail_limit skipped tasks. The text is rendered on the first call and cached.
+        """
+        summary = self._summary
+        if summary is None:
+            return None
+        if self._explanation is not None and self._explanation[0] == detail_limit:
+            return self._explanation[1]
+
+        lines = [
+            f"Generated {summary.mode} for {summary.owner_name} "
+            f"with {summary.available_minutes} minutes available.",
+            f"Selected {summary.selected} tasks totaling {summary.total_minutes} minutes.",
+        ]
+        if summary.pet_minutes is None:
+            lines.append("Tasks prioritized by urgency and importance.")
+        else:
+            pet_summary = ", ".join(f"{name}: {minutes} min" for name, minutes in summary.pet_minutes)
+            lines.append(f"Time per pet: {pet_summary or 'none'}.")
+
+        if summary.preferences:
+            lines.append(f"Owner preferences considered: {summary.preferences}")
+            if summary.time_of_day:
+                lines.append(f"Preferred time of day: {summary.time_of_day}")
+
+        skipped = [(task, decision) for task, decision in self.get_decisions() if decision != "selected"]
+        if skipped:
+            counts = Counter(decision for _, decision in skipped)
+            lines.append("Skipped " + ", ".join(f"{count} {decision}" for decision, count in counts.items()) + ".")
+            for task, decision in skipped[:detail_limit]:
+                lines.append(f"- {task.title} ({task.duration_minutes} min): {decision}")
+            if len(skipped) > detail_limit:
+                lines.append(f"- ... and {len(skipped) - detail_limit} more")
+
+        text = "\n".join(lines)
+        self._explanation = (detail_limit, text)
+        return text
+
+    def _record(
+        self,
+        owner: Owner,
+        mode: str,
+        total_time: int,
+        decisions: array,
+        tasks: List[CareTask],
+    ) -> None:
+        """
+        Keep what explain_plan() needs without formatting any text.
+        The tasks are copied so later edits to the caller's list can't shift decisions.
+        """
+        self._summary = _PlanSummary(
+            mode=mode,
+            owner_name=owner.name,
+            available_minutes=owner.available_minutes,
+            preferences=owner.preferences,
+            time_of_day=owner.get_preferences().time_of_day if owner.preferences else None,
+            selected=len(self.plan),
+            total_minutes=total_time,
+        )
+        self._decisions = decisions
+        self._decision_tasks = tuple(tasks)
+        self._explanation = None
 
     def filter_tasks_by_constraints(self, tasks: List[CareTask]) -> List[CareTask]:
         """
         Filter tasks based on scheduler constraints.
         If no constraints, return all tasks.
         """
-        if not self.constraints:
-            return tasks
+        category = parse_category_constraint(self.constraints)
 
-        # Parse constraints and filter accordingly
-        filtered = []
-        constraints_lower = self.constraints.lower()
-
-        # Example constraint filtering by category
-        if "category:" in constraints_lower:
-            # Extract category from constraints (simple parsing)
-            category_constraint = constraints_lower.split("category:")[1].split()[0].strip()
-            for task in tasks:
-                if task.category.lower() == category_constraint:
-                    filtered.append(task)
-            return filtered
-        else:
-            # If constraints don't match expected format, include all tasks
+        # If constraints don't name a category, include all tasks
+        if category is None:
             return tasks
+        return [task for task in tasks if task.category.lower() == category]
+
+
+def parse_category_constraint(constraints: Optional[str]) -> Optional[str]:
+    """Return the lowercase category named by a "category:<name>" constraint, if any."""
+    if not constraints:
+        return None
+    constraints_lower = constraints.lower()
+    if "category:" not in constraints_lower:
+        return None
+    words = constraints_lower.split("category:")[1].split()
+    return words[0] if words else None
+
+
+_priority = attrgetter("priority")
+
+
+def _dense_ranks(scores: List[float]) -> List[int]:
+    """Replace each score by its rank among the distinct scores, keeping their order."""
+    ranks = {score: rank for rank, score in enumerate(sorted(set(scores)))}
+    return list(map(ranks.__getitem__, scores))
+
+
+def _parse_cursor(cursor: Optional[str], parts: int) -> Tuple[int, ...]:
+    """Decode a pagination cursor of colon-separated non-negative integers."""
+    if cursor is None:
+        return (0,) * parts
+    try:
+        values = tuple(int(value) for value in cursor.split(":"))
+    except ValueError:
+        values = ()
+    if len(values) != parts or min(values) < 0:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return values
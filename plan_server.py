@@ -0,0 +1,244 @@
+"""Long-running local plan server that keeps PawPal+ owners and plans warm.
+
+Clients POST batches of JSON messages to /batch:
+
+    {"messages": [
+        {"op": "create_owner", "owner_id": "sarah", "owner": {"name": "Sarah", "available_minutes": 120}},
+        {"op": "add_pet", "owner_id": "sarah", "pet": {"name": "Max", "species": "Dog", "age": 3}},
+        {"op": "add_task", "owner_id": "sarah", "pet": 0, "task": {...}},
+        {"op": "plan", "owner_id": "sarah", "constraints": "category:exercise", "explain": true}
+    ]}
+
+Mutations use the same format as pawpal_events.EventLog records. The response
+holds one result per message, in order. Run with:
+
+    python plan_server.py --port 8765 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from pawpal_events import apply_event
+from pawpal_system import Owner, Scheduler
+
+# Plans cached per owner; distinct (constraints, ranking) pairs beyond this
+# evict the oldest
+MAX_CACHED_PLANS = 16
+
+
+@dataclass
+class _OwnerEntry:
+    owner: Owner
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    version: int = 0
+    # (constraints, ranking) -> (version, scheduler, plan snapshot)
+    plans: Dict[Tuple[Optional[str], str], Tuple[int, Scheduler, List[Dict[str, Any]]]] = field(
+        default_factory=dict
+    )
+
+
+class PlanService:
+    """
+    Holds owners in memory and answers batches of mutation and plan messages.
+
+    Each batch is split by owner and the groups run on a worker pool. A group
+    holds only its own owner's lock, so work for different owners runs in
+    parallel while messages for one owner keep their order. Plans are cached
+    per owner until the next mutation, up to MAX_CACHED_PLANS at a time.
+    """
+
+    def __init__(self, workers: int = 8) -> None:
+        self._owners: Dict[str, _OwnerEntry] = {}
+        self._registry_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plan-worker")
+
+    def handle_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process a batch of messages and return one result per message, in order."""
+        results: List[Dict[str, Any]] = [{} for _ in messages]
+        groups: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for index, message in enumerate(messages):
+            owner_id = message.get("owner_id") if isinstance(message, dict) else None
+            if not isinstance(owner_id, str):
+                # Can't be grouped, so it fails alone before any group runs
+                results[index] = {"ok": False, "error": f"ValueError: Invalid owner_id {owner_id!r}"}
+                continue
+            groups.setdefault(owner_id, []).append((index, message))
+
+        futures = [self._pool.submit(self._run_group, group) for group in groups.values()]
+        for future in futures:
+            for index, result in future.result():
+                results[index] = result
+        return results
+
+    def get_owner(self, owner_id: str) -> Owner:
+        """Return the live Owner held for owner_id."""
+        return self._entry(owner_id).owner
+
+    def close(self) -> None:
+        """Stop the worker pool."""
+        self._pool.shutdown(wait=True)
+
+    # ----- Message handling -----
+
+    def _run_group(
+        self, group: List[Tuple[int, Dict[str, Any]]]
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        results = []
+        for index, message in group:
+            try:
+                result = self._run_message(message)
+            except Exception as exc:
+                # One bad message must never fail the rest of the batch
+                result = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            results.append((index, result))
+        return results
+
+    def _run_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        owner_id = message["owner_id"]
+        op = message["op"]
+
+        if op == "create_owner":
+            entry = _OwnerEntry(owner=Owner.from_dict(message["owner"]))
+            with self._registry_lock:
+                if owner_id in self._owners:
+                    raise ValueError(f"Owner '{owner_id}' already exists")
+                self._owners[owner_id] = entry
+            return {"ok": True}
+
+        entry = self._entry(owner_id)
+        with entry.lock:
+            if op == "plan":
+                return self._plan(entry, message)
+            apply_event(entry.owner, message)
+            entry.version += 1
+            # Every cached plan is now stale
+            entry.plans.clear()
+        return {"ok": True}
+
+    def _plan(self, entry: _OwnerEntry, message: Dict[str, Any]) -> Dict[str, Any]:
+        # Called with entry.lock held
+        key = (message.get("constraints"), message.get("ranking", "priority"))
+        cached = entry.plans.get(key)
+        hit = cached is not None and cached[0] == entry.version
+        if hit:
+            _, scheduler, snapshot = cached
+        else:
+            scheduler = Scheduler(constraints=key[0], ranking=key[1])
+            scheduler.generate_plan(entry.owner, entry.owner.get_all_tasks())
+            snapshot = scheduler.snapshot_plan(entry.owner)
+            if key not in entry.plans and len(entry.plans) >= MAX_CACHED_PLANS:
+                del entry.plans[next(iter(entry.plans))]
+            entry.plans[key] = (entry.version, scheduler, snapshot)
+
+        result: Dict[str, Any] = {"ok": True, "plan": snapshot, "cached": hit}
+        if message.get("explain"):
+            result["explanation"] = scheduler.explain_plan()
+        return result
+
+    def _entry(self, owner_id: str) -> _OwnerEntry:
+        entry = self._owners.get(owner_id)
+        if entry is None:
+            raise ValueError(f"Owner '{owner_id}' not found")
+        return entry
+
+
+class _PlanRequestHandler(BaseHTTPRequestHandler):
+    server: PlanServer
+
+    def do_POST(self) -> None:
+        if self.path != "/batch":
+            self._send(404, {"error": f"Unknown path '{self.path}'"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            messages = json.loads(self.rfile.read(length))["messages"]
+            if not isinstance(messages, list) or not all(isinstance(m, dict) for m in messages):
+                raise ValueError("messages must be a list of objects")
+        except (KeyError, TypeError, ValueError) as exc:
+            self._send(400, {"error": f"Bad request: {exc}"})
+            return
+        try:
+            results = self.server.service.handle_batch(messages)
+        except Exception as exc:
+            # Always answer, so the client isn't left waiting on a dead handler
+            self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        self._send(200, {"results": results})
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(200, {"ok": True})
+        else:
+            self._send(404, {"error": f"Unknown path '{self.path}'"})
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep the hot path quiet; the server is meant to run unattended
+        pass
+
+
+class PlanServer(ThreadingHTTPServer):
+    """HTTP front end for a PlanService, bound to localhost by default."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, workers: int = 8) -> None:
+        super().__init__((host, port), _PlanRequestHandler)
+        self.service = PlanService(workers=workers)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL the server is listening on."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="plan-server", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the socket and worker pool."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+        self.service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the PawPal+ plan server.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=8, help="worker threads for message batches")
+    args = parser.parse_args()
+
+    server = PlanServer(args.host, args.port, args.workers)
+    print(f"PawPal+ plan server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+
+
+if __name__ == "__main__":
+    main()
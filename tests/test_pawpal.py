@@ -1,7 +1,19 @@
 """Comprehensive test suite for PawPal+ system."""
 
+import json
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
-from pawpal_system import CareTask, Pet, Owner, Scheduler
+from pawpal_system import CareTask, CarePreferences, Pet, PlanDiff, Owner, Scheduler
+from pawpal_events import EventLog, replay_owner
+from pawpal_store import OwnerRepository
+from pawpal_memory import PlanMemoryProfiler, measure_owner, track_allocations
+from plan_server import MAX_CACHED_PLANS, PlanServer, PlanService
+from benchmarks.load_harness import SessionProfile, percentile, run_load_test
 
 
 # ===== Test 1: Task Completion and Due Status =====
@@ -403,3 +415,1080 @@ def test_completed_tasks_excluded():
     # Only task2 should be in the plan (task1 is completed and not recurring)
     assert len(plan) == 1
     assert plan[0].title == "Task 2"
+
+
+# ===== Test 10: Event Log and Replay =====
+
+def _build_logged_owner(log):
+    """Apply one of every recorded mutation through the event log."""
+    dog = Pet(name="Rex", species="Dog", age=4)
+    log.add_pet(dog)
+
+    walk = CareTask(title="Walk", duration_minutes=30, priority=8, category="exercise")
+    feed = CareTask(title="Feed", duration_minutes=10, priority=9, category="feeding")
+    log.add_task(dog, walk)
+    log.add_task(dog, feed)
+
+    log.update_priority(dog, walk, 10)
+    log.update_duration(dog, walk, 45)
+    log.mark_complete(dog, feed)
+    log.edit_task(dog, CareTask(title="Walk", duration_minutes=20, priority=7, category="exercise"))
+    log.update_preferences("Morning walks preferred")
+
+
+def test_event_log_replay_rebuilds_owner(tmp_path):
+    """Verify replaying the log reconstructs the mutated owner."""
+    path = str(tmp_path / "owner.log")
+    owner = Owner(name="Jamie", available_minutes=90)
+
+    with EventLog(path, owner) as log:
+        _build_logged_owner(log)
+
+    restored = replay_owner(path)
+
+    assert restored.to_dict() == owner.to_dict()
+    assert restored.pets[0].tasks[0].duration_minutes == 20
+    assert restored.pets[0].tasks[1].is_completed is True
+    assert restored.preferences == "Morning walks preferred"
+
+
+def test_event_log_writes_in_batches(tmp_path):
+    """Verify events are buffered until a full batch is written."""
+    path = tmp_path / "owner.log"
+    owner = Owner(name="Jamie", available_minutes=90)
+    log = EventLog(str(path), owner, batch_size=3, sync=False)
+
+    log.add_pet(Pet(name="Rex", species="Dog", age=4))
+    log.update_preferences("Quiet evenings")
+    assert path.read_text() == ""
+
+    log.update_preferences("Morning walks")
+    assert len(path.read_text().splitlines()) == 3
+
+    log.close()
+
+
+def test_event_log_flushes_partial_batch_after_deadline(tmp_path):
+    """Verify a batch that never fills is still written once max_delay passes."""
+    path = tmp_path / "owner.log"
+    owner = Owner(name="Jamie", available_minutes=90)
+    log = EventLog(str(path), owner, batch_size=64, sync=False, max_delay=0.05)
+
+    log.add_pet(Pet(name="Rex", species="Dog", age=4))
+    assert replay_owner(str(path)).pets == []
+
+    deadline = time.monotonic() + 5
+    while not path.read_text() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [pet.name for pet in replay_owner(str(path)).pets] == ["Rex"]
+    log.close()
+
+    with pytest.raises(ValueError, match="Flush delay must be positive"):
+        EventLog(str(tmp_path / "other.log"), owner, max_delay=0)
+
+
+def test_event_log_compaction(tmp_path):
+    """Verify compaction folds events into the snapshot and empties the log."""
+    path = tmp_path / "owner.log"
+    owner = Owner(name="Jamie", available_minutes=90)
+    log = EventLog(str(path), owner, batch_size=1, sync=False, compact_every=3)
+
+    _build_logged_owner(log)
+
+    # 8 events with compaction every 3: only the last 2 remain in the log
+    assert len(path.read_text().splitlines()) == 2
+    log.close()
+
+    assert replay_owner(str(path)).to_dict() == owner.to_dict()
+
+    # Reopening resumes from disk and keeps recording
+    reopened = EventLog(str(path))
+    reopened.add_task(reopened.owner.pets[0], CareTask(title="Brush", duration_minutes=5, priority=3, category="grooming"))
+    reopened.close()
+
+    assert len(replay_owner(str(path)).pets[0].tasks) == 3
+
+
+def test_event_log_ignores_torn_tail(tmp_path):
+    """Verify a half-written final event is skipped during replay."""
+    path = tmp_path / "owner.log"
+    owner = Owner(name="Jamie", available_minutes=90)
+
+    with EventLog(str(path), owner) as log:
+        log.add_pet(Pet(name="Rex", species="Dog", age=4))
+
+    with open(path, "a") as f:
+        f.write('{"pet":{"name":"Half"')
+
+    assert [pet.name for pet in replay_owner(str(path)).pets] == ["Rex"]
+
+
+def test_event_log_rejects_existing_log(tmp_path):
+    """Verify a new log cannot silently overwrite an existing one."""
+    path = str(tmp_path / "owner.log")
+    EventLog(path, Owner(name="Jamie", available_minutes=90)).close()
+
+    with pytest.raises(ValueError, match="already exists"):
+        EventLog(path, Owner(name="Other", available_minutes=30))
+
+
+# ===== Test 11: Fair Multi-Pet Scheduling =====
+
+def _greedy_household():
+    """Owner whose dog has enough high-priority work to starve the cat."""
+    owner = Owner(name="Robin", available_minutes=60)
+    dog = Pet(name="Rex", species="Dog", age=4)
+    cat = Pet(name="Mittens", species="Cat", age=2)
+
+    dog.add_task(CareTask(title="Walk", duration_minutes=30, priority=10, category="exercise"))
+    dog.add_task(CareTask(title="Training", duration_minutes=20, priority=9, category="play"))
+    dog.add_task(CareTask(title="Brush", duration_minutes=10, priority=9, category="grooming"))
+    cat.add_task(CareTask(title="Feed cat", duration_minutes=10, priority=7, category="feeding"))
+    cat.add_task(CareTask(title="Play", duration_minutes=10, priority=6, category="play"))
+
+    owner.add_pet(dog)
+    owner.add_pet(cat)
+    return owner
+
+
+def test_fair_plan_without_quotas_matches_priority_plan():
+    """Verify the fair plan reduces to the plain priority plan with no quotas."""
+    owner = _greedy_household()
+
+    fair_plan = Scheduler().generate_fair_plan(owner)
+    plan = Scheduler().generate_plan(owner, owner.get_all_tasks())
+
+    assert fair_plan == plan
+    assert [task.title for task in fair_plan] == ["Walk", "Training", "Brush"]
+
+
+def test_fair_plan_minimum_minutes():
+    """Verify a pet's minimum minutes are reserved before others compete."""
+    owner = _greedy_household()
+
+    plan = Scheduler().generate_fair_plan(owner, min_minutes={"Mittens": 20})
+
+    titles = [task.title for task in plan]
+    assert "Feed cat" in titles and "Play" in titles
+    assert sum(task.duration_minutes for task in plan) <= owner.available_minutes
+
+
+def test_fair_plan_maximum_minutes():
+    """Verify a pet never exceeds its maximum minutes."""
+    owner = _greedy_household()
+
+    plan = Scheduler().generate_fair_plan(owner, max_minutes={"Rex": 40})
+
+    dog_minutes = sum(task.duration_minutes for task in plan if task in owner.pets[0].tasks)
+    assert dog_minutes <= 40
+    assert [task.title for task in plan] == ["Walk", "Brush", "Feed cat", "Play"]
+
+
+def test_fair_plan_weighted_share():
+    """Verify weighted fair share gives the behind pet the next turn."""
+    owner = _greedy_household()
+
+    plan = Scheduler().generate_fair_plan(owner, weights={"Rex": 1, "Mittens": 1})
+
+    assert [task.title for task in plan] == ["Walk", "Feed cat", "Play", "Brush"]
+
+
+def test_fair_plan_invalid_quotas():
+    """Verify inconsistent quotas and weights are rejected."""
+    owner = _greedy_household()
+
+    with pytest.raises(ValueError, match="exceed its maximum"):
+        Scheduler().generate_fair_plan(owner, min_minutes={"Rex": 50}, max_minutes={"Rex": 30})
+
+    with pytest.raises(ValueError, match="weights must be positive"):
+        Scheduler().generate_fair_plan(owner, weights={"Rex": 0})
+
+
+# ===== Test 12: Top-K and Pagination =====
+
+def _numbered_owner(task_counts):
+    """Owner with one pet per count, each holding numbered tasks."""
+    owner = Owner(name="Kai", available_minutes=1000)
+    for p, count in enumerate(task_counts):
+        pet = Pet(name=f"Pet{p}", species="Dog", age=1)
+        for t in range(count):
+            pet.add_task(CareTask(title=f"P{p}T{t}", duration_minutes=5, priority=(p + t) % 7, category="play"))
+        owner.add_pet(pet)
+    return owner
+
+
+def test_owner_top_tasks_matches_full_sort():
+    """Verify top-k selection matches the first k of a stable full sort."""
+    owner = _numbered_owner([5, 0, 8, 3])
+    owner.pets[0].tasks[0].mark_complete()
+
+    expected = sorted(
+        (task for task in owner.get_all_tasks() if task.is_due()),
+        key=lambda t: t.priority,
+        reverse=True,
+    )[:4]
+
+    assert owner.top_tasks(4) == expected
+    assert len(owner.top_tasks(4, due_only=False)) == 4
+
+
+def test_scheduler_top_tasks_respects_constraints():
+    """Verify scheduler top-k only considers tasks passing its constraints."""
+    tasks = [
+        CareTask(title="Walk", duration_minutes=30, priority=9, category="exercise"),
+        CareTask(title="Feed", duration_minutes=10, priority=10, category="feeding"),
+        CareTask(title="Run", duration_minutes=20, priority=7, category="exercise"),
+    ]
+
+    owner = Owner(name="Kai", available_minutes=60)
+
+    top = Scheduler(constraints="category:exercise").top_tasks(owner, tasks, 1)
+
+    assert [task.title for task in top] == ["Walk"]
+
+
+@pytest.mark.parametrize("ranking", ["priority", "priority_per_minute", "preference"])
+def test_scheduler_top_tasks_matches_limited_plan(ranking):
+    """Verify top-k follows the scheduler's ranking, tie-break and exclusions like generate_plan."""
+    owner = Owner(name="Kai", available_minutes=500, preferences="no grooming, lots of play")
+    tasks = [
+        CareTask(title="brush", duration_minutes=10, priority=9, category="grooming"),
+        CareTask(title="walk", duration_minutes=30, priority=8, category="exercise"),
+        CareTask(title="fetch", duration_minutes=15, priority=7, category="play"),
+        CareTask(title="feed", duration_minutes=30, priority=8, category="feeding"),
+    ]
+    scheduler = Scheduler(ranking=ranking, tie_break="shortest")
+
+    top = scheduler.top_tasks(owner, tasks, 2)
+
+    assert top == scheduler.generate_plan(owner, tasks, limit=2)
+    if ranking == "preference":
+        assert [task.title for task in top] == ["fetch", "walk"]
+
+
+def test_owner_task_pagination_walks_all_tasks():
+    """Verify cursor pagination returns every task exactly once, in order."""
+    owner = _numbered_owner([3, 0, 4, 2])
+
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = owner.get_tasks_page(cursor, limit=4)
+        pages.append(page)
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [4, 4, 1]
+    assert [task for page in pages for task in page] == owner.get_all_tasks()
+
+
+def test_pagination_rejects_bad_input():
+    """Verify malformed cursors and page sizes raise ValueError."""
+    owner = _numbered_owner([2])
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        owner.get_tasks_page("abc")
+
+    with pytest.raises(ValueError, match="Page size must be positive"):
+        Scheduler().get_plan_page(limit=0)
+
+
+def test_plan_pagination_and_limit():
+    """Verify plan pages and limited plans follow the full plan order."""
+    owner = _numbered_owner([6, 6])
+    scheduler = Scheduler()
+    full_plan = scheduler.generate_plan(owner, owner.get_all_tasks())
+
+    first, cursor = scheduler.get_plan_page(limit=5)
+    second, cursor = scheduler.get_plan_page(cursor, limit=10)
+
+    assert first + second == full_plan
+    assert cursor is None
+    assert Scheduler().generate_plan(owner, owner.get_all_tasks(), limit=5) == first
+
+
+@pytest.mark.parametrize("available_minutes, limit", [(1000, None), (35, None), (1000, 4), (35, 2)])
+def test_plan_same_with_heap_or_sort_selection(monkeypatch, available_minutes, limit):
+    """Verify the heap and single-sort selection paths produce the same plan and decisions."""
+    owner = _numbered_owner([6, 6])
+    owner.available_minutes = available_minutes
+    owner.pets[1].tasks[2].duration_minutes = 15
+    results = []
+    for share in (2.0, 0.0):
+        monkeypatch.setattr("pawpal_system.HEAP_SELECTION_SHARE", share)
+        scheduler = Scheduler(tie_break="shortest")
+        plan = scheduler.generate_plan(owner, owner.get_all_tasks(), limit=limit)
+        results.append((plan, scheduler.get_decisions()))
+
+    assert results[0] == results[1]
+
+
+# ===== Test 13: Ranking Strategies =====
+
+def _ranking_tasks():
+    return [
+        CareTask(title="Long walk", duration_minutes=60, priority=8, category="exercise"),
+        CareTask(title="Quick feed", duration_minutes=5, priority=6, category="feeding"),
+        CareTask(title="Meds", duration_minutes=10, priority=8, category="medical"),
+        CareTask(title="Brush", duration_minutes=15, priority=4, category="grooming"),
+    ]
+
+
+def test_default_ranking_keeps_insertion_order_on_ties():
+    """Verify the default priority ranking is stable for equal priorities."""
+    owner = Owner(name="Lee", available_minutes=200)
+
+    ranked = Scheduler().rank_tasks(owner, _ranking_tasks())
+
+    assert [task.title for task in ranked] == ["Long walk", "Meds", "Quick feed", "Brush"]
+
+
+def test_shortest_tie_break():
+    """Verify the shortest tie-break prefers shorter tasks at equal priority."""
+    owner = Owner(name="Lee", available_minutes=200)
+
+    ranked = Scheduler(tie_break="shortest").rank_tasks(owner, _ranking_tasks())
+
+    assert [task.title for task in ranked] == ["Meds", "Long walk", "Quick feed", "Brush"]
+
+
+def test_priority_per_minute_ranking():
+    """Verify priority density favors high value per minute."""
+    owner = Owner(name="Lee", available_minutes=200)
+
+    ranked = Scheduler(ranking="priority_per_minute").rank_tasks(owner, _ranking_tasks())
+
+    assert [task.title for task in ranked] == ["Quick feed", "Meds", "Brush", "Long walk"]
+
+
+def test_category_weight_ranking():
+    """Verify category weights scale task priority."""
+    owner = Owner(name="Lee", available_minutes=200)
+    scheduler = Scheduler(ranking="category_weight", category_weights={"grooming": 3.0})
+
+    ranked = scheduler.rank_tasks(owner, _ranking_tasks())
+
+    assert ranked[0].title == "Brush"  # 4 * 3.0 beats 8
+
+
+def test_preference_ranking_changes_plan():
+    """Verify owner preference boosts decide which tasks fit the budget."""
+    owner = Owner(name="Lee", available_minutes=60, preferences="Never miss the meds")
+    tasks = _ranking_tasks()
+
+    plain_plan = Scheduler().generate_plan(owner, tasks)
+    preference_plan = Scheduler(ranking="preference").generate_plan(owner, tasks)
+
+    assert [task.title for task in plain_plan] == ["Long walk"]
+    assert [task.title for task in preference_plan] == ["Meds", "Quick feed", "Brush"]
+
+
+@pytest.mark.parametrize("ranking", ["priority", "priority_per_minute", "category_weight"])
+def test_shortest_tie_break_matches_tuple_sort(ranking):
+    """Verify the single precomputed key orders like a (score, duration) tuple sort."""
+    owner = Owner(name="Lee", available_minutes=200)
+    tasks = _numbered_owner([12]).get_all_tasks() + _ranking_tasks()
+    for i, task in enumerate(tasks):
+        task.duration_minutes = 5 + (i * 7) % 20
+    scheduler = Scheduler(ranking=ranking, tie_break="shortest", category_weights={"play": 1.5})
+    score = {
+        "priority": lambda t: t.priority,
+        "priority_per_minute": lambda t: t.priority / t.duration_minutes,
+        "category_weight": lambda t: t.priority * scheduler.category_weights.get(t.category, 1.0),
+    }[ranking]
+
+    expected = sorted(tasks, key=lambda t: (-score(t), t.duration_minutes))
+
+    assert scheduler.rank_tasks(owner, tasks) == expected
+
+
+def test_fair_plan_shortest_tie_break_matches_plan():
+    """Verify cross-pet ties in a fair plan follow the tie-break, not pet order."""
+    owner = Owner(name="Lee", available_minutes=30)
+    for name, title, duration in (("Rex", "long", 30), ("Mittens", "short", 10)):
+        pet = Pet(name=name, species="Dog", age=2)
+        pet.add_task(CareTask(title=title, duration_minutes=duration, priority=5, category="play"))
+        owner.add_pet(pet)
+    scheduler = Scheduler(tie_break="shortest")
+
+    plan = scheduler.generate_plan(owner, owner.get_all_tasks())
+    fair_plan = scheduler.generate_fair_plan(owner)
+
+    assert [task.title for task in plan] == ["short"]
+    assert [task.title for task in fair_plan] == ["short"]
+
+
+def test_unknown_ranking_rejected():
+    """Verify unknown strategies and tie-breaks raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown ranking strategy"):
+        Scheduler(ranking="random")
+
+    with pytest.raises(ValueError, match="Unknown tie-break"):
+        Scheduler(tie_break="longest")
+
+
+# ===== Test 14: Structured Preferences =====
+
+def test_preferences_parsing():
+    """Verify free-text preferences become boosts, exclusions and a time of day."""
+    preferences = CarePreferences.parse("Prefer outdoor walks in the morning, no baths; avoid the vet")
+
+    assert preferences.category_boosts == {"exercise": 4.0}
+    assert preferences.excluded_categories == frozenset({"grooming", "medical"})
+    assert preferences.time_of_day == "morning"
+
+
+def test_empty_preferences():
+    """Verify missing preferences parse to a neutral model."""
+    preferences = CarePreferences.parse(None)
+
+    assert preferences.category_boosts == {}
+    assert preferences.excluded_categories == frozenset()
+    assert preferences.time_of_day is None
+
+
+def test_preferences_cached_until_updated():
+    """Verify preferences are parsed once and re-parsed after an update."""
+    owner = Owner(name="Quinn", available_minutes=60, preferences="Lots of play time")
+
+    first = owner.get_preferences()
+    assert owner.get_preferences() is first
+    assert first.category_boosts == {"play": 2.0}
+
+    owner.update_preferences("Skip grooming")
+
+    updated = owner.get_preferences()
+    assert updated is not first
+    assert updated.excluded_categories == frozenset({"grooming"})
+
+
+@pytest.mark.parametrize(
+    "text, boosted",
+    [
+        ("Give meds on time, never skip the vet checkup", {"medical": 4.0}),
+        ("No rush with breakfast", {"feeding": 2.0}),
+        ("I don't mind walks", {"exercise": 2.0}),
+    ],
+)
+def test_cancelled_negation_does_not_exclude(text, boosted):
+    """Verify double negatives and phrases like "don't mind" don't exclude a category."""
+    preferences = CarePreferences.parse(text)
+
+    assert preferences.excluded_categories == frozenset()
+    assert preferences.category_boosts == boosted
+
+
+@pytest.mark.parametrize(
+    "text, excluded",
+    [
+        ("Please don't schedule grooming", {"grooming"}),
+        ("I don't like baths", {"grooming"}),
+        ("prefer not to bathe", {"grooming"}),
+        ("no walks or baths", {"exercise", "grooming"}),
+    ],
+)
+def test_negation_excludes_rest_of_clause(text, excluded):
+    """Verify a negation excludes every category after it in the clause and boosts none."""
+    preferences = CarePreferences.parse(text)
+
+    assert preferences.excluded_categories == frozenset(excluded)
+    assert preferences.category_boosts == {}
+
+
+def test_excluded_categories_left_out_of_preference_plan():
+    """Verify excluded categories are left out only under the preference ranking."""
+    owner = Owner(name="Quinn", available_minutes=120, preferences="No grooming please")
+    pet = Pet(name="Biscuit", species="Dog", age=3)
+    pet.add_task(CareTask(title="Brush", duration_minutes=15, priority=10, category="Grooming"))
+    pet.add_task(CareTask(title="Walk", duration_minutes=30, priority=8, category="exercise"))
+    owner.add_pet(pet)
+
+    scheduler = Scheduler(ranking="preference")
+    plan = scheduler.generate_plan(owner, owner.get_all_tasks())
+
+    assert [task.title for task in plan] == ["Walk"]
+    assert [task.title for task in scheduler.generate_fair_plan(owner)] == ["Walk"]
+    assert [task.title for task in Scheduler().generate_plan(owner, owner.get_all_tasks())] == ["Brush", "Walk"]
+
+
+def test_preference_boost_ignores_category_case():
+    """Verify boosts apply to task categories regardless of their case."""
+    owner = Owner(name="Quinn", available_minutes=120, preferences="Lots of play time")
+    tasks = [
+        CareTask(title="Walk", duration_minutes=30, priority=8, category="exercise"),
+        CareTask(title="Fetch", duration_minutes=15, priority=7, category="Play"),
+    ]
+
+    ranked = Scheduler(ranking="preference").rank_tasks(owner, tasks)
+
+    assert [task.title for task in ranked] == ["Fetch", "Walk"]
+
+
+def test_time_of_day_in_reasoning():
+    """Verify the preferred time of day is surfaced in the reasoning."""
+    owner = Owner(name="Quinn", available_minutes=60, preferences="Evening play sessions")
+    owner.add_pet(Pet(name="Biscuit", species="Dog", age=3))
+
+    scheduler = Scheduler()
+    scheduler.generate_plan(owner, owner.get_all_tasks())
+
+    assert "Preferred time of day: evening" in scheduler.explain_plan()
+
+
+# ===== Test 15: Structured Plan Decisions =====
+
+def test_plan_records_decision_per_task():
+    """Verify every input task gets a decision explaining its outcome."""
+    owner = Owner(name="Ari", available_minutes=40, preferences="No baths please")
+    pet = Pet(name="Scout", species="Dog", age=5)
+    walk = CareTask(title="Walk", duration_minutes=30, priority=9, category="exercise")
+    run = CareTask(title="Run", duration_minutes=20, priority=8, category="exercise")
+    done = CareTask(title="Fetch", duration_minutes=5, priority=7, category="exercise", is_completed=True)
+    bath = CareTask(title="Bath", duration_minutes=10, priority=10, category="grooming")
+    feed = CareTask(title="Feed", duration_minutes=5, priority=10, category="feeding")
+    for task in (walk, run, done, bath, feed):
+        pet.add_task(task)
+    owner.add_pet(pet)
+
+    scheduler = Scheduler(constraints="category:exercise")
+    scheduler.generate_plan(owner, owner.get_all_tasks())
+
+    assert scheduler.get_decisions() == [
+        (walk, "selected"),
+        (run, "over budget"),
+        (done, "not due"),
+        (bath, "filtered by constraint"),
+        (feed, "filtered by constraint"),
+    ]
+
+    scheduler = Scheduler(ranking="preference")
+    scheduler.generate_plan(owner, owner.get_all_tasks(), limit=1)
+
+    decisions = dict((task.title, decision) for task, decision in scheduler.get_decisions())
+    assert decisions["Bath"] == "excluded by preference"
+    assert decisions["Feed"] == "selected"
+    assert decisions["Walk"] == "beyond limit"
+
+
+def test_fair_plan_records_quota_decisions():
+    """Verify fair plans mark tasks skipped for a pet's maximum minutes."""
+    owner = _greedy_household()
+    scheduler = Scheduler()
+
+    scheduler.generate_fair_plan(owner, max_minutes={"Rex": 40})
+
+    decisions = dict((task.title, decision) for task, decision in scheduler.get_decisions())
+    assert decisions["Training"] == "over pet quota"
+    assert "Time per pet: Rex: 40 min, Mittens: 20 min." in scheduler.explain_plan()
+
+
+def test_decisions_unaffected_by_later_task_changes():
+    """Verify adding or removing tasks after planning doesn't shift recorded decisions."""
+    owner = _greedy_household()
+    tasks = owner.get_all_tasks()
+    scheduler = Scheduler()
+    scheduler.generate_plan(owner, tasks)
+    expected = scheduler.get_decisions()
+    fair_scheduler = Scheduler()
+    fair_scheduler.generate_fair_plan(owner)
+    expected_fair = fair_scheduler.get_decisions()
+
+    tasks.pop(0)
+    owner.pets[0].tasks.pop(0)
+    owner.pets[1].add_task(CareTask(title="Nap", duration_minutes=5, priority=1, category="play"))
+
+    assert scheduler.get_decisions() == expected
+    assert fair_scheduler.get_decisions() == expected_fair
+    assert [task.title for task, _ in expected_fair] == ["Walk", "Training", "Brush", "Feed cat", "Play"]
+
+
+def test_explain_plan_is_lazy_and_lists_skipped_tasks():
+    """Verify the explanation is rendered on demand and details skipped tasks."""
+    owner = Owner(name="Ari", available_minutes=30)
+    pet = Pet(name="Scout", species="Dog", age=5)
+    for i in range(5):
+        pet.add_task(CareTask(title=f"Task {i}", duration_minutes=20, priority=i, category="play"))
+    owner.add_pet(pet)
+
+    scheduler = Scheduler()
+    assert scheduler.explain_plan() is None
+
+    scheduler.generate_plan(owner, owner.get_all_tasks())
+    explanation = scheduler.explain_plan(detail_limit=2)
+    assert "Skipped 4 over budget." in explanation
+    assert "- Task 0 (20 min): over budget" in explanation
+    assert "- ... and 2 more" in explanation
+    assert scheduler.explain_plan(detail_limit=2) is explanation
+    assert scheduler.reasoning.startswith("Generated plan for Ari")
+
+
+# ===== Test 16: SQLite Owner Repository =====
+
+def _stored_household():
+    owner = Owner(name="Blair", available_minutes=90, preferences="Morning walks")
+    dog = Pet(name="Rex", species="Dog", age=4)
+    cat = Pet(name="Mittens", species="Cat", age=2)
+    dog.add_task(CareTask(title="Walk", duration_minutes=30, priority=9, category="exercise", is_recurring=True))
+    dog.add_task(CareTask(title="Bath", duration_minutes=20, priority=5, category="Grooming"))
+    dog.add_task(CareTask(title="Vet visit", duration_minutes=60, priority=8, category="medical", is_completed=True))
+    cat.add_task(CareTask(title="Feed", duration_minutes=5, priority=10, category="feeding"))
+    owner.add_pet(dog)
+    owner.add_pet(cat)
+    return owner
+
+
+def test_repository_round_trip():
+    """Verify an owner saved to SQLite loads back unchanged."""
+    owner = _stored_household()
+
+    with OwnerRepository() as repo:
+        owner_id = repo.save_owner(owner)
+        loaded = repo.load_owner(owner_id)
+
+    assert loaded == owner
+
+
+def test_repository_bulk_save_keeps_households_apart():
+    """Verify bulk inserts assign each household its own pets and tasks."""
+    owners = [_stored_household() for _ in range(3)]
+    owners[1].pets[0].tasks[0].update_priority(1)
+
+    with OwnerRepository() as repo:
+        owner_ids = repo.save_owners(owners)
+        loaded = [repo.load_owner(owner_id) for owner_id in owner_ids]
+
+    assert loaded == owners
+
+
+def test_repository_household_filters_in_one_query():
+    """Verify household loading filters due status and category in a single query."""
+    with OwnerRepository() as repo:
+        owner_id = repo.save_owner(_stored_household())
+
+        statements = []
+        repo.connection.set_trace_callback(statements.append)
+        household = repo.load_household(owner_id, constraints="category:grooming")
+        repo.connection.set_trace_callback(None)
+
+    assert len(statements) == 1
+    assert [pet.name for pet in household.pets] == ["Rex", "Mittens"]
+    assert [task.title for task in household.get_all_tasks()] == ["Bath"]
+
+
+def test_repository_load_household_feeds_scheduler():
+    """Verify a loaded household plans the same as the in-memory owner."""
+    owner = _stored_household()
+
+    with OwnerRepository() as repo:
+        household = repo.load_household(repo.save_owner(owner))
+
+    assert "Vet visit" not in [task.title for task in household.get_all_tasks()]
+    assert Scheduler().generate_plan(household, household.get_all_tasks()) == Scheduler().generate_plan(
+        owner, owner.get_all_tasks()
+    )
+
+
+def test_repository_update_and_delete():
+    """Verify updates replace stored pets and deletes remove the owner."""
+    owner = _stored_household()
+
+    with OwnerRepository() as repo:
+        owner_id = repo.save_owner(owner)
+        owner.pets[1].tasks[0].mark_complete()
+        owner.add_pet(Pet(name="Tweety", species="Bird", age=1))
+        repo.update_owner(owner_id, owner)
+
+        assert repo.load_owner(owner_id) == owner
+
+        repo.delete_owner(owner_id)
+        with pytest.raises(ValueError, match="not found"):
+            repo.load_owner(owner_id)
+
+
+def test_repository_concurrent_saves_get_distinct_ids(tmp_path):
+    """Verify saves from many threads and two connections never reuse an owner id."""
+    path = str(tmp_path / "owners.db")
+    with OwnerRepository(path) as first, OwnerRepository(path) as second:
+        repos = [first, second]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            owner_ids = list(pool.map(lambda i: repos[i % 2].save_owner(_stored_household()), range(40)))
+
+        assert len(set(owner_ids)) == 40
+        assert all(first.load_owner(owner_id) == _stored_household() for owner_id in owner_ids)
+
+
+# ===== Test 17: Load Harness =====
+
+@pytest.mark.parametrize("mode", ["threads", "asyncio"])
+def test_load_harness_reports_latency_and_memory(mode):
+    """Verify the load harness drives every flow and reports percentiles."""
+    profile = SessionProfile(pets=2, tasks_per_pet=3, schedules=1)
+
+    report = run_load_test(sessions=6, concurrency=3, mode=mode, profile=profile)
+
+    assert len(report.latencies["add_pet"]) == 12
+    assert len(report.latencies["add_task"]) == 36
+    assert len(report.latencies["generate_schedule"]) == 6
+    stats = report.percentiles("generate_schedule")
+    assert 0 < stats["p50"] <= stats["p95"] <= stats["p99"]
+    assert report.retained_bytes_per_session > 0
+    assert "p99 ms" in report.format()
+
+
+def test_percentile_nearest_rank():
+    """Verify nearest-rank percentiles on a small sample."""
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+# ===== Test 18: Plan Diffing =====
+
+def test_plan_diff_between_days():
+    """Verify added, removed and reprioritized tasks are detected by key."""
+    owner = _greedy_household()
+    scheduler = Scheduler()
+    scheduler.generate_plan(owner, owner.get_all_tasks())
+    yesterday = scheduler.snapshot_plan(owner)
+
+    assert [entry["key"] for entry in yesterday] == ["Rex/Walk", "Rex/Training", "Rex/Brush"]
+
+    dog, cat = owner.pets
+    dog.tasks[1].mark_complete()         # Training drops out
+    dog.tasks[2].update_priority(10)     # Brush moves up
+    cat.tasks[0].update_priority(9)      # Feed cat now fits
+    scheduler.generate_plan(owner, owner.get_all_tasks())
+
+    diff = scheduler.diff_plan(owner, yesterday)
+
+    assert diff.has_changes
+    assert [entry["key"] for entry in diff.added] == ["Mittens/Feed cat", "Mittens/Play"]
+    assert diff.removed == ["Rex/Training"]
+    assert diff.reprioritized == [{"key": "Rex/Brush", "old_priority": 9, "priority": 10}]
+
+
+def test_plan_diff_unchanged_and_delta_round_trip():
+    """Verify an unchanged plan has an empty delta and deltas round-trip."""
+    owner = _greedy_household()
+    scheduler = Scheduler()
+    scheduler.generate_plan(owner, owner.get_all_tasks())
+    snapshot = scheduler.snapshot_plan(owner)
+
+    unchanged = scheduler.diff_plan(owner, snapshot)
+    assert not unchanged.has_changes
+    assert unchanged.to_delta() == "{}"
+
+    diff = scheduler.diff_plan(owner, [])
+    delta = diff.to_delta()
+    assert delta.startswith('{"+":[["Rex/Walk",10,30]')
+    assert PlanDiff.from_delta(delta).to_delta() == delta
+
+
+def test_plan_snapshot_disambiguates_repeated_titles():
+    """Verify tasks sharing a pet and title get distinct keys."""
+    owner = Owner(name="Sky", available_minutes=60)
+    pet = Pet(name="Rex", species="Dog", age=2)
+    pet.add_task(CareTask(title="Walk", duration_minutes=10, priority=9, category="exercise"))
+    pet.add_task(CareTask(title="Walk", duration_minutes=10, priority=8, category="exercise"))
+    owner.add_pet(pet)
+
+    scheduler = Scheduler()
+    scheduler.generate_plan(owner, owner.get_all_tasks())
+
+    assert [entry["key"] for entry in scheduler.snapshot_plan(owner)] == ["Rex/Walk", "Rex/Walk#1"]
+
+
+# ===== Test 19: Memory Accounting =====
+
+# sys.getsizeof of one CareTask on CPython 3.11: the object itself; its attribute
+# values live in a separate inline-values block that getsizeof doesn't report
+BYTES_PER_TASK = 56
+
+
+def test_memory_report_per_task_cost():
+    """Verify the per-task memory cost stays within its pinned budget."""
+    owner = _numbered_owner([50, 50])
+
+    report = measure_owner(owner)
+
+    assert report.pet_count == 2
+    assert report.task_count == 100
+    assert report.bytes_per_task == pytest.approx(BYTES_PER_TASK, abs=8)
+    assert report.strings_bytes > 0
+    assert report.total_bytes == (
+        report.owner_bytes + report.pets_bytes + report.tasks_bytes + report.strings_bytes
+    )
+
+
+def test_memory_report_counts_shared_strings_once():
+    """Verify a string shared by many tasks is only counted once."""
+    title = "".join(["Shared ", "title"])
+    owner = Owner(name="Val", available_minutes=60)
+    pet = Pet(name="Rex", species="Dog", age=2)
+    owner.add_pet(pet)
+
+    pet.add_task(CareTask(title=title, duration_minutes=10, priority=5, category="play"))
+    one_task = measure_owner(owner)
+    for _ in range(9):
+        pet.add_task(CareTask(title=title, duration_minutes=10, priority=5, category="play"))
+    ten_tasks = measure_owner(owner)
+
+    assert ten_tasks.strings_bytes == one_task.strings_bytes
+    assert ten_tasks.tasks_bytes == 10 * one_task.tasks_bytes
+
+
+def test_measure_owner_leaves_no_allocations_behind():
+    """Verify measuring doesn't materialize attribute dicts that outlive the report."""
+    # A same-sized warm-up fills the interpreter's free lists first
+    measure_owner(_numbered_owner([1000, 1000]))
+    owner = _numbered_owner([1000, 1000])
+
+    with track_allocations() as stats:
+        measure_owner(owner)
+
+    assert stats.allocated_bytes < 2000 * 8
+
+
+def test_plan_memory_profiler_sampling():
+    """Verify only every n-th plan is traced and peaks are recorded."""
+    owner = _numbered_owner([100, 100])
+    profiler = PlanMemoryProfiler(Scheduler(), sample_every=2)
+
+    for _ in range(5):
+        plan = profiler.generate_plan(owner)
+
+    assert plan == Scheduler().generate_plan(owner, owner.get_all_tasks())
+    assert profiler.summary()["calls"] == 5
+    assert len(profiler.samples) == 3
+    assert profiler.peak_bytes > 0
+
+    with pytest.raises(ValueError, match="Sampling interval must be positive"):
+        PlanMemoryProfiler(Scheduler(), sample_every=0)
+
+
+def test_plan_memory_profiler_keeps_bounded_samples():
+    """Verify only the latest samples are kept while the summary covers every call."""
+    owner = _numbered_owner([20])
+    profiler = PlanMemoryProfiler(Scheduler(), max_samples=2)
+
+    for _ in range(5):
+        profiler.generate_plan(owner)
+
+    assert len(profiler.samples) == 2
+    assert profiler.summary()["samples"] == 5
+    assert profiler.peak_bytes >= max(sample.peak_bytes for sample in profiler.samples)
+
+    with pytest.raises(ValueError, match="Sample limit must be positive"):
+        PlanMemoryProfiler(Scheduler(), max_samples=0)
+
+
+def test_track_allocations_shares_tracing_between_threads():
+    """Verify overlapping blocks keep tracing on until the last one exits."""
+    assert not tracemalloc.is_tracing()
+
+    def allocate(size):
+        with track_allocations() as stats:
+            data = bytearray(size)
+            assert tracemalloc.is_tracing()
+        del data
+        return stats
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(allocate, [200_000] * 16))
+
+    assert not tracemalloc.is_tracing()
+    assert all(stats.peak_bytes >= 200_000 for stats in results)
+
+
+def test_track_allocations_leaves_outer_peak_alone():
+    """Verify a block inside an outer tracer doesn't reset the outer peak."""
+    tracemalloc.start()
+    try:
+        data = bytearray(500_000)
+        del data
+        with track_allocations():
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    assert peak >= 500_000
+
+
+# ===== Test 20: Plan Server =====
+
+def _household_messages(owner_id):
+    return [
+        {"op": "create_owner", "owner_id": owner_id, "owner": {"name": owner_id, "available_minutes": 40}},
+        {"op": "add_pet", "owner_id": owner_id, "pet": {"name": "Rex", "species": "Dog", "age": 4}},
+        {
+            "op": "add_task", "owner_id": owner_id, "pet": 0,
+            "task": {"title": "Walk", "duration_minutes": 30, "priority": 9, "category": "exercise"},
+        },
+        {
+            "op": "add_task", "owner_id": owner_id, "pet": 0,
+            "task": {"title": "Feed", "duration_minutes": 10, "priority": 10, "category": "feeding"},
+        },
+        {"op": "plan", "owner_id": owner_id},
+    ]
+
+
+def test_plan_service_caches_plans_until_mutation():
+    """Verify plans stay warm until the owner changes."""
+    service = PlanService(workers=2)
+    try:
+        results = service.handle_batch(_household_messages("sam"))
+        assert all(result["ok"] for result in results)
+        assert [entry["key"] for entry in results[-1]["plan"]] == ["Rex/Feed", "Rex/Walk"]
+        assert results[-1]["cached"] is False
+
+        (again,) = service.handle_batch([{"op": "plan", "owner_id": "sam"}])
+        assert again["cached"] is True
+
+        changed = service.handle_batch([
+            {"op": "update_priority", "owner_id": "sam", "pet": 0, "task": 1, "priority": 1},
+            {"op": "plan", "owner_id": "sam", "explain": True},
+        ])
+        assert changed[1]["cached"] is False
+        assert changed[1]["plan"][0]["key"] == "Rex/Walk"
+        assert "Generated plan for sam" in changed[1]["explanation"]
+        assert service.get_owner("sam").pets[0].tasks[1].priority == 1
+    finally:
+        service.close()
+
+
+def test_plan_service_reports_errors_per_message():
+    """Verify a bad message fails alone without breaking the batch."""
+    service = PlanService(workers=2)
+    try:
+        results = service.handle_batch([
+            {"op": "plan", "owner_id": "ghost"},
+            {"op": "create_owner", "owner_id": "kim", "owner": {"name": "Kim", "available_minutes": 30}},
+            {"op": "teleport", "owner_id": "kim"},
+            {"op": "plan", "owner_id": "kim"},
+        ])
+    finally:
+        service.close()
+
+    assert results[0] == {"ok": False, "error": "ValueError: Owner 'ghost' not found"}
+    assert results[1] == {"ok": True}
+    assert results[2]["ok"] is False and "Unknown event" in results[2]["error"]
+    assert results[3] == {"ok": True, "plan": [], "cached": False}
+
+
+def test_plan_service_rejects_bad_positions_and_durations():
+    """Verify negative positions and zero durations fail without touching the owner."""
+    service = PlanService(workers=2)
+    try:
+        service.handle_batch(_household_messages("lou"))
+        results = service.handle_batch([
+            {"op": "update_priority", "owner_id": "lou", "pet": -1, "task": 0, "priority": 1},
+            {"op": "mark_complete", "owner_id": "lou", "pet": 0, "task": True},
+            {"op": "mark_complete", "owner_id": "lou", "pet": 0, "task": 5},
+            {
+                "op": "add_task", "owner_id": "lou", "pet": 0,
+                "task": {"title": "Nap", "duration_minutes": 0, "priority": 3, "category": "play"},
+            },
+            {"op": "plan", "owner_id": "lou", "ranking": "priority_per_minute"},
+        ])
+        owner = service.get_owner("lou")
+    finally:
+        service.close()
+
+    assert results[0] == {"ok": False, "error": "ValueError: Invalid pet position -1"}
+    assert results[1] == {"ok": False, "error": "ValueError: Invalid task position True"}
+    assert results[2] == {"ok": False, "error": "ValueError: Invalid task position 5"}
+    assert results[3] == {"ok": False, "error": "ValueError: Duration must be positive"}
+    assert results[4]["ok"] is True
+    assert [task.priority for task in owner.get_all_tasks()] == [9, 10]
+    assert not any(task.is_completed for task in owner.get_all_tasks())
+
+
+def test_plan_service_contains_unexpected_errors(monkeypatch):
+    """Verify any exception from one message is reported in place."""
+    service = PlanService(workers=2)
+    try:
+        service.handle_batch(_household_messages("mo"))
+
+        def explode(self, owner, tasks, limit=None):
+            raise ZeroDivisionError("division by zero")
+
+        monkeypatch.setattr(Scheduler, "generate_plan", explode)
+        results = service.handle_batch([
+            {"op": "plan", "owner_id": "mo", "constraints": "category:play"},
+            {"op": "mark_complete", "owner_id": "mo", "pet": 0, "task": 0},
+        ])
+    finally:
+        service.close()
+
+    assert results == [{"ok": False, "error": "ZeroDivisionError: division by zero"}, {"ok": True}]
+
+
+def test_plan_service_rejects_bad_owner_ids_per_message():
+    """Verify messages with a missing or unhashable owner_id fail alone."""
+    service = PlanService(workers=2)
+    try:
+        results = service.handle_batch([
+            {"op": "plan", "owner_id": ["not", "hashable"]},
+            {"op": "create_owner", "owner_id": "zoe", "owner": {"name": "Zoe", "available_minutes": 30}},
+            {"op": "plan"},
+        ])
+        owner = service.get_owner("zoe")
+    finally:
+        service.close()
+
+    assert results[0] == {"ok": False, "error": "ValueError: Invalid owner_id ['not', 'hashable']"}
+    assert results[1] == {"ok": True}
+    assert results[2] == {"ok": False, "error": "ValueError: Invalid owner_id None"}
+    assert owner.name == "Zoe"
+
+
+def test_plan_service_bounds_cached_plans():
+    """Verify per-owner plan caches are capped and dropped on mutation."""
+    service = PlanService(workers=1)
+    try:
+        service.handle_batch(_household_messages("ash"))
+        service.handle_batch(
+            [{"op": "plan", "owner_id": "ash", "constraints": f"category:c{i}"} for i in range(40)]
+        )
+        entry = service._entry("ash")
+        assert len(entry.plans) == MAX_CACHED_PLANS
+        assert ("category:c39", "priority") in entry.plans
+
+        service.handle_batch([{"op": "mark_complete", "owner_id": "ash", "pet": 0, "task": 0}])
+        assert entry.plans == {}
+    finally:
+        service.close()
+
+
+def test_plan_server_over_localhost():
+    """Verify concurrent HTTP batches for different owners all succeed."""
+    server = PlanServer(port=0, workers=4)
+    server.start()
+
+    def post(messages):
+        request = urllib.request.Request(
+            server.url + "/batch",
+            data=json.dumps({"messages": messages}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())["results"]
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            batches = list(pool.map(post, [_household_messages(f"owner{i}") for i in range(8)]))
+
+        for results in batches:
+            assert all(result["ok"] for result in results)
+            assert len(results[-1]["plan"]) == 2
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(urllib.request.Request(server.url + "/batch", data=b"{}"), timeout=10)
+        assert excinfo.value.code == 400
+    finally:
+        server.stop()